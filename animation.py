@@ -0,0 +1,116 @@
+"""Data-driven sprite animations shared by the player, enemies and coins.
+
+An Animation precomputes the timeline of its frames once, so finding the frame
+for an elapsed time is a bisect. Animations are built once per process and
+shared by every sprite that plays them. AnimatedSprite plays a dict of them
+keyed by state name and reuses one hit box per texture, so switching states
+doesn't allocate.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+import arcade
+from arcade.hitbox import RotatableHitBox
+
+FRAME_DURATION = 0.1  # seconds per frame unless an animation says otherwise
+
+
+class Animation:
+    """Frames played for [frame_duration] seconds each (or a list of durations)."""
+
+    def __init__(self, frames, frame_duration=FRAME_DURATION, loop=True) -> None:
+        self.frames = tuple(frames)
+        if isinstance(frame_duration, (int, float)):
+            frame_duration = [frame_duration] * len(self.frames)
+        # end time of each frame within one cycle
+        self.timeline = list(accumulate(frame_duration))
+        self.duration = self.timeline[-1]
+        self.loop = loop
+
+    @property
+    def static(self) -> bool:
+        return len(self.frames) == 1
+
+    def frame_index(self, elapsed) -> int:
+        if self.static:
+            return 0
+        if self.loop:
+            elapsed %= self.duration
+        elif elapsed >= self.duration:
+            return len(self.frames) - 1
+        return bisect_right(self.timeline, elapsed)
+
+
+def make_animations(
+    frames: dict[str, list[arcade.Texture]], frame_duration=FRAME_DURATION
+) -> dict[str, Animation]:
+    return {
+        state: Animation(textures, frame_duration) for state, textures in frames.items()
+    }
+
+
+class AnimatedSprite(arcade.Sprite):
+    """A sprite playing one of [animations] at a time, chosen with set_state().
+
+    Call update_animation() every tick to advance frames by elapsed time.
+    """
+
+    def __init__(
+        self,
+        animations: dict[str, Animation],
+        state="idle",
+        scale=1.0,
+        center_x=0.0,
+        center_y=0.0,
+    ):
+        animation = animations[state]
+        super().__init__(animation.frames[0], scale, center_x, center_y)
+        self.animations = animations
+        self.animation = animation
+        self.textures = animation.frames
+        self.state = state
+        self.time_elapsed = 0.0
+        # hit boxes by texture; the current one follows the sprite's position
+        # and scale (facing), so a reused one is brought up to date on reuse
+        self.hit_boxes = {self.texture: self.hit_box}
+
+    @property
+    def animated(self) -> bool:
+        """Whether any of its states has more than one frame to play."""
+        return not all(animation.static for animation in self.animations.values())
+
+    def set_state(self, new_state) -> None:
+        if self.state == new_state:
+            return
+        self.state = new_state
+        self.animation = self.animations[new_state]
+        self.textures = self.animation.frames
+        self.time_elapsed = 0.0
+        self.cur_texture_index = 0
+        self.texture = self.textures[0]
+        self.hit_box = self.cached_hit_box(self.texture)
+
+    def cached_hit_box(self, texture: arcade.Texture) -> RotatableHitBox:
+        hit_box = self.hit_boxes.get(texture)
+        if hit_box is None:
+            hit_box = RotatableHitBox(
+                texture.hit_box_points,
+                position=self.position,
+                angle=self.angle,
+                scale=self.scale,
+            )
+            self.hit_boxes[texture] = hit_box
+        else:
+            hit_box.position = self.position
+            hit_box.scale = self.scale
+            hit_box.angle = self.angle
+        return hit_box
+
+    def update_animation(self, delta_time=1 / 60, *args, **kwargs) -> None:
+        if self.animation.static:
+            return
+        self.time_elapsed += delta_time
+        index = self.animation.frame_index(self.time_elapsed)
+        if index != self.cur_texture_index:
+            self.cur_texture_index = index
+            self.texture = self.textures[index]
@@ -0,0 +1,127 @@
+"""Process-wide texture registry shared by the engine and the maker.
+
+Each texture is loaded once and the same arcade.Texture is handed out on every
+later request. Textures packed into the built atlas (see atlas.py) come from
+its single image; anything else is loaded from its own file. Load counts and
+timings are kept for reporting.
+"""
+
+import os
+import time
+import arcade
+import atlas
+from animation import Animation, make_animations
+
+IMAGES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "assets", "images"
+)
+WALK_DIR = os.path.join(IMAGES_DIR, "walk")
+
+PATHS = {
+    "player_idle": os.path.join(IMAGES_DIR, "p1_stand.png"),
+    "player_duck": os.path.join(IMAGES_DIR, "p1_duck.png"),
+    "player_jump": os.path.join(IMAGES_DIR, "p1_jump.png"),
+    "player_fall": os.path.join(IMAGES_DIR, "p1_fall.png"),
+    "red_x": os.path.join(IMAGES_DIR, "red_x.png"),
+    "enemy": ":resources:/images/enemies/slimeBlock.png",
+    "coin": ":resources:/images/items/gold_1.png",
+}
+
+_textures: dict[str, arcade.Texture] = {}
+_atlas: list[atlas.Atlas | None] = []  # loaded on first use; None if not built
+_walk: list[arcade.Texture] = []
+_animations: dict[str, dict[str, Animation]] = {}
+load_times: dict[str, float] = {}  # seconds spent loading each file
+requests = 0  # texture lookups, including cache hits
+
+
+def walk_paths() -> dict[str, str]:
+    """Walk cycle frames in order, by name (the file name without extension)."""
+    return {
+        os.path.splitext(filename)[0]: os.path.join(WALK_DIR, filename)
+        for filename in sorted(os.listdir(WALK_DIR))
+    }
+
+
+def sources() -> dict[str, str]:
+    """Every texture packed into the atlas, by name."""
+    return PATHS | walk_paths()
+
+
+def sequences() -> dict[str, list[str]]:
+    return {"walk": list(walk_paths())}
+
+
+def get_atlas() -> atlas.Atlas | None:
+    if not _atlas:
+        start = time.perf_counter()
+        _atlas.append(atlas.load())
+        if _atlas[0] is not None:
+            load_times[atlas.IMAGE_PATH] = time.perf_counter() - start
+    return _atlas[0]
+
+
+def get_texture(name) -> arcade.Texture:
+    """Get a texture by registry name (see PATHS) or file path, loading it once."""
+    global requests
+    requests += 1
+    path = PATHS.get(name, name)
+    texture = _textures.get(path)
+    if texture is None:
+        packed = get_atlas()
+        if packed is not None and name in packed.textures:
+            texture = packed.textures[name]
+        else:
+            start = time.perf_counter()
+            texture = arcade.load_texture(path)
+            load_times[path] = time.perf_counter() - start
+        _textures[path] = texture
+    return texture
+
+
+def get_walk() -> list[arcade.Texture]:
+    if not _walk:
+        packed = get_atlas()
+        if packed is not None:
+            _walk.extend(packed.sequence("walk"))
+        else:
+            _walk.extend(map(get_texture, walk_paths().values()))
+    return _walk
+
+
+def animations(name, frames) -> dict[str, Animation]:
+    """Animations built once per process from [frames], a function returning
+    state -> textures, and shared by every sprite of kind [name]."""
+    if name not in _animations:
+        _animations[name] = make_animations(frames())
+    return _animations[name]
+
+
+def player_animations() -> dict[str, Animation]:
+    return animations(
+        "player",
+        lambda: {
+            "idle": [get_texture("player_idle")],
+            "walk": get_walk(),
+            "duck": [get_texture("player_duck")],
+            "jump": [get_texture("player_jump")],
+            "fall": [get_texture("player_fall")],
+        },
+    )
+
+
+def enemy_animations() -> dict[str, Animation]:
+    return animations("enemy", lambda: {"idle": [get_texture("enemy")]})
+
+
+def coin_animations() -> dict[str, Animation]:
+    return animations("coin", lambda: {"idle": [get_texture("coin")]})
+
+
+def stats() -> dict:
+    return {
+        "loaded": len(load_times),
+        "requests": requests,
+        "load_time": sum(load_times.values()),
+        "load_times": dict(load_times),
+    }
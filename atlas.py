@@ -0,0 +1,136 @@
+"""Offline texture atlas: every engine and maker texture packed into one image.
+
+The build step loads each source texture once, shelf-packs them into
+atlas.png and writes atlas.json with each frame's rectangle and hit box
+points. At runtime the atlas is decoded in one read and cut into textures
+with their hit boxes already set, so nothing is computed per texture.
+
+Rebuild it after changing any image:
+
+    python atlas.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import arcade
+from PIL import Image
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+IMAGE_PATH = os.path.join(ASSETS_DIR, "atlas.png")
+MANIFEST_PATH = os.path.join(ASSETS_DIR, "atlas.json")
+
+VERSION = 1
+MAX_WIDTH = 1024  # pixels per shelf
+PADDING = 1  # transparent pixels between frames
+
+
+def pack(sizes: dict[str, tuple[int, int]], max_width=MAX_WIDTH):
+    """Shelf-pack (width, height) [sizes], tallest first.
+
+    Returns the (x, y) of each frame and the atlas size.
+    """
+    positions = {}
+    x = y = shelf_height = width = 0
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1], name)):
+        frame_width, frame_height = sizes[name]
+        if x and x + frame_width > max_width:
+            x, y = 0, y + shelf_height + PADDING
+            shelf_height = 0
+        positions[name] = x, y
+        x += frame_width + PADDING
+        width = max(width, x - PADDING)
+        shelf_height = max(shelf_height, frame_height)
+    return positions, (width, y + shelf_height)
+
+
+def build(
+    sources: dict[str, str],
+    sequences: dict[str, list[str]],
+    image_path=IMAGE_PATH,
+    manifest_path=MANIFEST_PATH,
+) -> dict:
+    """Pack the textures at [sources] (name -> path) into one atlas.
+
+    [sequences] names ordered frame lists, such as animation cycles.
+    """
+    textures = {name: arcade.load_texture(path) for name, path in sources.items()}
+    positions, size = pack({name: texture.size for name, texture in textures.items()})
+    image = Image.new("RGBA", size, (0, 0, 0, 0))
+    frames = {}
+    for name, texture in textures.items():
+        x, y = positions[name]
+        image.paste(texture.image.convert("RGBA"), (x, y))
+        frames[name] = {
+            "x": x,
+            "y": y,
+            "width": texture.width,
+            "height": texture.height,
+            "hit_box": [list(point) for point in texture.hit_box_points],
+        }
+    image.save(image_path)
+    with open(image_path, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()
+    manifest = {
+        "version": VERSION,
+        "image": os.path.basename(image_path),
+        "hash": digest,
+        "frames": frames,
+        "sequences": sequences,
+    }
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+
+class Atlas:
+    """Textures cut from a built atlas, by frame name."""
+
+    def __init__(self, manifest: dict, image: Image.Image) -> None:
+        self.textures: dict[str, arcade.Texture] = {}
+        self.sequences: dict[str, list[str]] = manifest["sequences"]
+        image = image.convert("RGBA")
+        for name, frame in manifest["frames"].items():
+            x, y = frame["x"], frame["y"]
+            self.textures[name] = arcade.Texture(
+                image.crop((x, y, x + frame["width"], y + frame["height"])),
+                hit_box_points=[tuple(point) for point in frame["hit_box"]],
+                hash=f"atlas-{manifest['hash']}-{name}",
+            )
+
+    def sequence(self, name) -> list[arcade.Texture]:
+        return [self.textures[frame] for frame in self.sequences[name]]
+
+
+def load(manifest_path=MANIFEST_PATH) -> Atlas | None:
+    """Load the atlas, or None if it hasn't been built (or is an older version)."""
+    try:
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != VERSION:
+        return None
+    image_path = os.path.join(os.path.dirname(manifest_path), manifest["image"])
+    with Image.open(image_path) as image:
+        image.load()
+        return Atlas(manifest, image)
+
+
+def main(argv=None) -> int:
+    import assets
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--image", default=IMAGE_PATH)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    args = parser.parse_args(argv)
+
+    manifest = build(assets.sources(), assets.sequences(), args.image, args.manifest)
+    print(f"packed {len(manifest['frames'])} textures into {args.image}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,507 @@
+"""Many copies of one level stepped together with NumPy, for playtesting agents.
+
+A BatchEnv holds N independent instances of a level. Each instance's player,
+coins, enemies and counters are rows of NumPy arrays, so one step() call
+advances every instance without sprites or a window:
+
+    env = batch.BatchEnv(level.load("level.ssml"), 1024)
+    observations = env.reset()
+    observations, rewards, dones = env.step(actions)
+
+Actions are the keys each instance holds, as LEFT | RIGHT | UP | DOWN | ATTACK
+bit flags. As with Player.on_key_press, jumps and attacks start on the tick
+their key goes down. The player collides as the bounding rectangle of its
+idle hit box against the level's tile grid, so play follows Simulation
+closely but not tick for tick.
+"""
+
+import numpy as np
+import level
+from engine import (
+    JUMP,
+    PATROL,
+    PLAYER_SCALE,
+    TILE_SIZE,
+    UPDATE_RATE,
+    ActiveRegion,
+    MovingEnemies,
+    grid_at,
+    make_player,
+)
+
+# action bits: the keys held during a step
+LEFT = 1
+RIGHT = 2
+UP = 4
+DOWN = 8
+ATTACK = 16
+
+# player states, as in Player
+IDLE, WALK, JUMPING, FALL, DUCK = range(5)
+
+# observation tile codes
+EMPTY = 0
+SOLID = 1
+COIN_TILE = 2
+ENEMY_TILE = 3
+VIEW_COLUMNS = 17  # tiles seen around the player
+VIEW_ROWS = 11
+# observation["player"] columns
+PLAYER_FEATURES = ("x", "y", "vx", "vy", "jumps_left", "attack_ticks")
+
+# reward per coin collected, enemy defeated and death
+REWARDS = (1.0, 1.0, -1.0)
+MAX_TICKS = 3600  # an episode ends after this many ticks
+ATTACK_TICKS = 30  # as in Player.update
+GROUND_DISTANCE = 5  # px; how far below its feet can_jump() looks for ground
+LANDING_TICKS = (1 / UPDATE_RATE) / 9  # as in Simulation.check_ground
+
+
+def spans(low, high) -> tuple[np.ndarray, np.ndarray]:
+    """The (up to 3) tiles each [low, high) pixel range covers, and which are real.
+
+    Ranges must be at most two tiles long.
+    """
+    first = np.floor(low / TILE_SIZE).astype(int)
+    last = np.ceil(high / TILE_SIZE).astype(int) - 1
+    cells = first[:, None] + np.arange(3)
+    return cells, cells <= last[:, None]
+
+
+def overlap(low, high, other_low, other_high) -> np.ndarray:
+    """Touching counts, as it does for arcade's hit box checks."""
+    return (low <= other_high) & (other_low <= high)
+
+
+class BatchEnv:
+    """[count] independent instances of [play_level].
+
+    Instances that finish (reaching the last column or MAX_TICKS) are reset by
+    the step() that finishes them, so the observations it returns for them
+    start their next episode.
+    """
+
+    def __init__(
+        self,
+        play_level: level.Level,
+        count,
+        jumps=2,
+        jump_speed=20,
+        movement_speed=8,
+        gravity=1.0,
+        max_ticks=MAX_TICKS,
+        rewards=REWARDS,
+    ):
+        self.count = count
+        self.level_width = play_level.level_width
+        self.jumps = jumps
+        self.jump_speed = jump_speed
+        self.movement_speed = movement_speed
+        self.gravity = gravity
+        self.max_ticks = max_ticks
+        self.rewards = np.array(rewards, float)
+
+        # the player's box, relative to its center
+        player = make_player(PLAYER_SCALE)
+        self.left = player.left - player.center_x
+        self.right = player.right - player.center_x
+        self.bottom = player.bottom - player.center_y
+        self.top = player.top - player.center_y
+        self.left_edge = player.width / 2.0
+        self.right_edge = self.level_width - player.width / 2.0
+        self.fall_y = -player.height / 2
+        self.start_x, self.start_y = level.player_center(*play_level.player)
+
+        # static tiles, with one padding cell on every side (see grid_at)
+        columns = int(np.ceil(self.level_width / TILE_SIZE))
+        tiles = [tile for kind in level.KINDS for tile in play_level.tiles(kind)]
+        rows = max([tile_y for _, tile_y in tiles] + [0]) + 1
+        self.shape = columns + 2, rows + 2
+        self.solid = np.zeros(self.shape, bool)
+        self.solid[self.cells(play_level.platforms)] = True
+        self.coins, self.coin_index = self.index(play_level.coins)
+        self.enemies, self.enemy_index = self.index(play_level.enemies)
+        self.codes = np.where(self.solid, SOLID, EMPTY).astype(np.int8)
+        self.codes[self.coin_index >= 0] = COIN_TILE
+        self.codes[self.enemy_index >= 0] = ENEMY_TILE
+        self.coin_box = self.box(level.COIN)
+        self.enemy_box = self.box(level.ENEMY)
+
+        # moving enemies share their movement with Simulation's; this env is
+        # their grid, so they walk on the same tiles as the player
+        self.moving = MovingEnemies(ActiveRegion(), gravity, play_level.level_width)
+        self.moving.grid = self
+        for kind, movement in ((level.PATROLLER, PATROL), (level.JUMPER, JUMP)):
+            self.moving.add(level.make_sprites(play_level, kind), movement)
+        self.moving.arrays()
+
+        shape = (count,)
+        self.x = np.zeros(shape)
+        self.y = np.zeros(shape)
+        self.vx = np.zeros(shape)
+        self.vy = np.zeros(shape)
+        self.state = np.zeros(shape, int)
+        self.on_ground = np.zeros(shape, bool)
+        self.time_since_ground = np.zeros(shape, int)
+        self.jumps_since_ground = np.zeros(shape, int)
+        self.held = np.zeros(shape, int)
+        self.last_pressed = np.zeros(shape, int)
+        self.attacking = np.zeros(shape, bool)
+        self.attack_time = np.zeros(shape, int)
+        self.ticks = np.zeros(shape, int)
+        self.collected_coins = np.zeros(shape, int)
+        self.enemies_defeated = np.zeros(shape, int)
+        self.death_count = np.zeros(shape, int)
+        self.collected = np.zeros((count, len(self.coins)), bool)
+        self.defeated = np.zeros((count, len(self.enemies)), bool)
+        moving = (count, self.moving.size)
+        self.enemy_x = np.zeros(moving)
+        self.enemy_y = np.zeros(moving)
+        self.enemy_vx = np.zeros(moving)
+        self.enemy_vy = np.zeros(moving)
+        self.enemy_on_ground = np.zeros(moving, bool)
+        self.enemy_defeated = np.zeros(moving, bool)
+        self.reset()
+
+    def cells(self, tiles) -> tuple[np.ndarray, np.ndarray]:
+        """Grid indices of the [tiles] inside the level."""
+        tiles = np.array(tiles, int).reshape(-1, 2)
+        inside = (
+            (tiles[:, 0] >= 0) & (tiles[:, 0] < self.shape[0] - 2) & (tiles[:, 1] >= 0)
+        )
+        return tiles[inside, 0] + 1, tiles[inside, 1] + 1
+
+    def index(self, tiles) -> tuple[np.ndarray, np.ndarray]:
+        """The [tiles] inside the level, and a grid of their indices (-1: none)."""
+        columns, rows = self.cells(tiles)
+        grid = np.full(self.shape, -1, int)
+        grid[columns, rows] = np.arange(len(columns))
+        return np.stack([columns - 1, rows - 1], axis=1), grid
+
+    def box(self, kind) -> tuple[float, float, float, float]:
+        """Left, right, bottom and top of a [kind] sprite relative to its tile."""
+        (sprite,) = level.make_tile_sprites(kind, [(0, 0)])
+        return sprite.left, sprite.right, sprite.bottom, sprite.top
+
+    def solid_at(self, columns, rows) -> np.ndarray:
+        return grid_at(self.solid, columns, rows)
+
+    def reset(self, mask=None) -> dict[str, np.ndarray]:
+        """Start a new episode in the instances in [mask] (default: all).
+
+        Returns the observations of every instance.
+        """
+        if mask is None:
+            mask = np.ones(self.count, bool)
+        self.x[mask] = self.start_x
+        self.y[mask] = self.start_y
+        self.vx[mask] = 0
+        self.vy[mask] = 0
+        self.state[mask] = IDLE
+        self.on_ground[mask] = True
+        self.time_since_ground[mask] = 0
+        self.jumps_since_ground[mask] = 0
+        self.held[mask] = 0
+        self.last_pressed[mask] = 0
+        self.attacking[mask] = False
+        self.attack_time[mask] = 0
+        self.ticks[mask] = 0
+        self.collected_coins[mask] = 0
+        self.enemies_defeated[mask] = 0
+        self.death_count[mask] = 0
+        self.collected[mask] = False
+        self.defeated[mask] = False
+        self.enemy_x[mask] = self.moving.spawn_x
+        self.enemy_y[mask] = self.moving.spawn_y
+        self.enemy_vx[mask] = self.moving.speed
+        self.enemy_vy[mask] = 0
+        self.enemy_on_ground[mask] = False
+        self.enemy_defeated[mask] = False
+        return self.observations()
+
+    def step(self, actions) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray]:
+        """Advance every instance one tick holding [actions] (one per instance).
+
+        Returns the observations, rewards and done flags.
+        """
+        actions = np.asarray(actions, int)
+        pressed = actions & ~self.held
+        self.held = actions
+        before = np.stack(
+            [self.collected_coins, self.enemies_defeated, self.death_count], axis=1
+        )
+        self.press(pressed)
+        self.move_enemies()
+        self.update_player()
+        self.move_player()
+        self.check_ground()
+        self.check_collisions()
+        self.ticks += 1
+
+        after = np.stack(
+            [self.collected_coins, self.enemies_defeated, self.death_count], axis=1
+        )
+        rewards = (after - before) @ self.rewards
+        dones = (self.x >= self.level_width - TILE_SIZE) | (
+            self.ticks >= self.max_ticks
+        )
+        if dones.any():
+            self.reset(dones)
+        return self.observations(), rewards, dones
+
+    def press(self, pressed) -> None:
+        """Player.on_key_press for the keys that went down."""
+        jump = (pressed & UP) != 0
+        if jump.any():
+            # can_jump(): touching the ground resets the jump count
+            grounded = jump & self.touching_ground()
+            self.jumps_since_ground[grounded] = 0
+            jump &= grounded | (self.jumps_since_ground < self.jumps)
+            self.vy[jump] = self.jump_speed
+            self.state[jump] = JUMPING
+            self.jumps_since_ground[jump] += 1
+            self.on_ground[jump] = False
+        self.last_pressed[(pressed & LEFT) != 0] = LEFT
+        self.last_pressed[(pressed & RIGHT) != 0] = RIGHT
+        self.attacking |= (pressed & ATTACK) != 0
+
+    def touching_ground(self) -> np.ndarray:
+        columns, real = spans(self.x + self.left, self.x + self.right)
+        feet = np.floor((self.y + self.bottom - GROUND_DISTANCE) / TILE_SIZE)
+        return (self.solid_at(columns, feet.astype(int)[:, None]) & real).any(axis=1)
+
+    def move_enemies(self) -> None:
+        if not self.moving.size:
+            return
+        (
+            self.enemy_x,
+            self.enemy_y,
+            self.enemy_vx,
+            self.enemy_vy,
+            self.enemy_on_ground,
+        ) = self.moving.move(
+            self.enemy_x,
+            self.enemy_y,
+            self.enemy_vx,
+            self.enemy_vy,
+            self.enemy_on_ground,
+            self.ticks[:, None],
+        )
+
+    def update_player(self) -> None:
+        """Player.update: ducking, walking and the attack timer."""
+        held = self.held
+        state = self.state
+        down = (held & DOWN) != 0
+        duck = down & self.on_ground
+        self.vx[duck] = 0
+        state[duck] = DUCK
+        state[~down & (state == DUCK) & self.on_ground] = IDLE
+
+        left = (held & LEFT) != 0
+        right = (held & RIGHT) != 0
+        airborne = (state == JUMPING) | (state == FALL)
+        for direction, other, last, sign in (
+            (left, right, LEFT, -1),
+            (right, left, RIGHT, 1),
+        ):
+            walk = direction & ((self.last_pressed == last) | ~other) & (state != DUCK)
+            self.vx[walk] = sign * self.movement_speed
+            state[walk & ~airborne] = WALK
+        still = ~left & ~right
+        self.vx[still] = 0
+        state[still & ~airborne & (state != DUCK)] = IDLE
+
+        timing = self.attacking & (self.attack_time < ATTACK_TICKS)
+        done = self.attacking & ~timing
+        self.attack_time[timing] += 1
+        self.attacking[done] = False
+        self.attack_time[done] = 0
+
+    def move_player(self) -> None:
+        """PhysicsEnginePlatformer.update against the tile grid: y, then x.
+
+        Moves are capped below a tile per tick, so nothing is tunneled through.
+        """
+        x = self.x
+        self.vy -= self.gravity
+        vy = np.clip(self.vy, 1 - TILE_SIZE, TILE_SIZE - 1)
+        y = self.y + vy
+        columns, real = spans(x + self.left, x + self.right)
+        feet = np.floor((y + self.bottom) / TILE_SIZE).astype(int)
+        land = (vy < 0) & (self.solid_at(columns, feet[:, None]) & real).any(axis=1)
+        y = np.where(land, (feet + 1) * TILE_SIZE - self.bottom, y)
+        head = np.ceil((y + self.top) / TILE_SIZE).astype(int) - 1
+        bump = (vy > 0) & (self.solid_at(columns, head[:, None]) & real).any(axis=1)
+        y = np.where(bump, head * TILE_SIZE - self.top, y)
+        self.vy[land | bump] = 0
+        self.y = y = np.round(y, 2)
+
+        rows, real = spans(y + self.bottom, y + self.top)
+        step = np.clip(self.vx, 1 - TILE_SIZE, TILE_SIZE - 1)
+        x = x + step
+        lead = np.where(
+            step > 0,
+            np.ceil((x + self.right) / TILE_SIZE).astype(int) - 1,
+            np.floor((x + self.left) / TILE_SIZE).astype(int),
+        )
+        wall = (step != 0) & (self.solid_at(lead[:, None], rows) & real).any(axis=1)
+        # ledges lower than the step are climbed, as with the engine's ramp_up
+        climb = wall & ~self.blocked(x, y + np.abs(step))
+        feet = np.ceil((y + self.bottom) / TILE_SIZE) * TILE_SIZE
+        self.y = np.where(climb, feet - self.bottom, y)
+        wall &= ~climb
+        x = np.where(wall & (step > 0), lead * TILE_SIZE - self.right, x)
+        self.x = np.where(wall & (step < 0), (lead + 1) * TILE_SIZE - self.left, x)
+
+    def blocked(self, x, y) -> np.ndarray:
+        """Whether the player's box at [x], [y] overlaps a solid tile."""
+        columns, real_columns = spans(x + self.left, x + self.right)
+        rows, real_rows = spans(y + self.bottom, y + self.top)
+        solid = self.solid_at(columns[:, :, None], rows[:, None, :])
+        return (solid & real_columns[:, :, None] & real_rows[:, None, :]).any(
+            axis=(1, 2)
+        )
+
+    def check_ground(self) -> None:
+        """Simulation.check_ground: level edges, falling out and landing."""
+        self.x = np.clip(self.x, self.left_edge, self.right_edge)
+        fell = self.y < self.fall_y
+        self.x[fell] = self.start_x
+        self.y[fell] = self.start_y
+        self.vx[fell] = 0
+        self.vy[fell] = 0
+        self.death_count += fell
+
+        state = self.state
+        falling = self.on_ground & (self.vy < 0) & (state == WALK)
+        state[falling] = FALL
+        self.on_ground[falling] = False
+        self.jumps_since_ground[falling] = 1
+
+        stopped = (
+            ~self.on_ground & ((state == JUMPING) | (state == FALL)) & (self.vy == 0)
+        )
+        land = stopped & (self.time_since_ground >= LANDING_TICKS)
+        state[land] = np.where(self.vx[land] != 0, WALK, IDLE)
+        self.on_ground[land] = True
+        self.time_since_ground[land] = 0
+        self.time_since_ground[stopped & ~land] += 1
+
+    def touched(self, grid, box) -> tuple[np.ndarray, np.ndarray]:
+        """(instances, indices) of the tile entities in [grid] the player touches."""
+        columns, real_columns = spans(self.x + self.left, self.x + self.right)
+        rows, real_rows = spans(self.y + self.bottom, self.y + self.top)
+        indices = grid_at(grid, columns[:, :, None], rows[:, None, :])
+        left, right, bottom, top = box
+        hit = (
+            (indices >= 0)
+            & real_columns[:, :, None]
+            & real_rows[:, None, :]
+            & overlap(
+                (self.x + self.left)[:, None, None],
+                (self.x + self.right)[:, None, None],
+                columns[:, :, None] * TILE_SIZE + left,
+                columns[:, :, None] * TILE_SIZE + right,
+            )
+            & overlap(
+                (self.y + self.bottom)[:, None, None],
+                (self.y + self.top)[:, None, None],
+                rows[:, None, :] * TILE_SIZE + bottom,
+                rows[:, None, :] * TILE_SIZE + top,
+            )
+        )
+        instances, column, row = np.nonzero(hit)
+        return instances, indices[instances, column, row]
+
+    def check_collisions(self) -> None:
+        """Simulation.check_collisions: enemies, then coins."""
+        hit = np.zeros(self.count, bool)
+        if len(self.enemies):
+            instances, indices = self.touched(self.enemy_index, self.enemy_box)
+            alive = ~self.defeated[instances, indices]
+            instances, indices = instances[alive], indices[alive]
+            hit[instances] = True
+        if self.moving.size:
+            moving = self.moving
+            touching = (
+                ~self.enemy_defeated
+                & (self.enemy_y + moving.top_offset >= 0)  # not fallen
+                & overlap(
+                    (self.x + self.left)[:, None],
+                    (self.x + self.right)[:, None],
+                    self.enemy_x + moving.left_offset,
+                    self.enemy_x + moving.right_offset,
+                )
+                & overlap(
+                    (self.y + self.bottom)[:, None],
+                    (self.y + self.top)[:, None],
+                    self.enemy_y + moving.bottom_offset,
+                    self.enemy_y + moving.top_offset,
+                )
+            )
+            hit |= touching.any(axis=1)
+        if hit.any():
+            # an attack defeats every enemy it touches; otherwise the player
+            # goes back to the start
+            died = hit & ~self.attacking
+            self.x[died] = self.start_x
+            self.y[died] = self.start_y
+            self.death_count += died
+            if len(self.enemies):
+                attack = self.attacking[instances]
+                self.defeated[instances[attack], indices[attack]] = True
+                np.add.at(self.enemies_defeated, instances[attack], 1)
+            if self.moving.size:
+                touching &= self.attacking[:, None]
+                self.enemy_defeated |= touching
+                self.enemies_defeated += touching.sum(axis=1)
+
+        if len(self.coins):
+            instances, indices = self.touched(self.coin_index, self.coin_box)
+            new = ~self.collected[instances, indices]
+            self.collected[instances[new], indices[new]] = True
+            self.collected_coins += np.bincount(instances[new], minlength=self.count)
+
+    def observations(self) -> dict[str, np.ndarray]:
+        """ "player": PLAYER_FEATURES per instance; "tiles": the VIEW_ROWS x
+        VIEW_COLUMNS tiles around the player (rows upward) as tile codes."""
+        player = np.stack(
+            [
+                self.x,
+                self.y,
+                self.vx,
+                self.vy,
+                self.jumps - self.jumps_since_ground,
+                np.where(self.attacking, ATTACK_TICKS - self.attack_time, 0),
+            ],
+            axis=1,
+        ).astype(np.float32)
+
+        left = np.floor(self.x / TILE_SIZE).astype(int) - VIEW_COLUMNS // 2
+        bottom = np.floor(self.y / TILE_SIZE).astype(int) - VIEW_ROWS // 2
+        columns = (left[:, None] + np.arange(VIEW_COLUMNS))[:, None, :]
+        rows = (bottom[:, None] + np.arange(VIEW_ROWS))[:, :, None]
+        tiles = grid_at(self.codes, columns, rows)
+        instances = np.arange(self.count)[:, None, None]
+        for taken, index in (
+            (self.collected, self.coin_index),
+            (self.defeated, self.enemy_index),
+        ):
+            if taken.shape[1]:
+                indices = grid_at(index, columns, rows)
+                gone = (indices >= 0) & taken[instances, np.maximum(indices, 0)]
+                tiles[gone] = EMPTY
+        if self.moving.size:
+            column = np.floor(self.enemy_x / TILE_SIZE).astype(int) - left[:, None]
+            row = np.floor(self.enemy_y / TILE_SIZE).astype(int) - bottom[:, None]
+            seen = (
+                ~self.enemy_defeated
+                & (column >= 0)
+                & (column < VIEW_COLUMNS)
+                & (row >= 0)
+                & (row < VIEW_ROWS)
+            )
+            instance, enemy = np.nonzero(seen)
+            tiles[instance, row[seen], column[seen]] = ENEMY_TILE
+        return {"player": player, "tiles": tiles}
@@ -0,0 +1,217 @@
+"""Scaling benchmarks on synthetic levels.
+
+Builds levels of increasing size through the engine API and times level
+construction, maker placement/deletion, the ENTER play-start rebuild and
+per-tick update cost. Results are written as JSON and can be compared
+against a saved baseline:
+
+    python bench.py --sizes 1000 10000 100000 --output bench.json
+    python bench.py --baseline bench.json --output bench-new.json
+
+Set ARCADE_HEADLESS=1 (or pass --headless) on machines without a display.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument(
+        "--density", type=float, default=0.5, help="fraction of cells filled"
+    )
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--edits", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench.json")
+    parser.add_argument("--baseline", help="compare against a saved result file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="slowdown ratio vs baseline that counts as a regression",
+    )
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument(
+        "--tile-physics",
+        action="store_true",
+        help="play with engine.TilePhysicsEngine",
+    )
+    return parser.parse_args(argv)
+
+
+def synthetic_tiles(size, density, rows, rng: random.Random):
+    """Lay out [size] tiles: a floor on row 0 and mixed tiles above it."""
+    columns = max(int(size / (density * rows)), 2)
+    tiles = []
+    for column in range(columns):
+        tiles.append(("platform", column, 0))
+    kinds = ("platform", "platform", "coin", "enemy")
+    while len(tiles) < size:
+        column = rng.randrange(columns)
+        row = rng.randrange(3, rows)
+        tiles.append((rng.choice(kinds), column, row))
+    return columns, tiles[:size]
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def build_game(engine, window, columns, tiles, tile_physics=False):
+    """Construct a level one entity at a time through the public engine API."""
+    tile = engine.TILE_SIZE
+    game = engine.make_game(
+        window,
+        engine.make_player(engine.PLAYER_SCALE),
+        level_width=columns * tile,
+        tile_physics=tile_physics,
+    )
+    game.make_ground()
+    for kind, column, row in tiles:
+        x, y = column * tile + tile / 2, row * tile + tile / 2
+        if kind == "platform":
+            game.make_platform(x, y, tile, tile)
+        elif kind == "enemy":
+            game.make_enemy(x, y, engine.ENEMY_SCALE)
+        else:
+            game.make_coin(x, y, engine.COIN_SCALE)
+    return game
+
+
+def time_ticks(step, ticks) -> dict:
+    times = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "mean": sum(times) / len(times),
+        "p95": times[int(len(times) * 0.95)],
+    }
+
+
+def bench_size(args, size, rng: random.Random) -> dict:
+    import arcade
+    import engine
+    import level
+    import main
+
+    window = main.get_window()
+    rows = window.height // engine.TILE_SIZE
+    columns, tiles = synthetic_tiles(size, args.density, rows, rng)
+    result = {"tiles": len(tiles), "level_width": columns * engine.TILE_SIZE}
+
+    result["construct"], game = timed(
+        build_game, engine, window, columns, tiles, args.tile_physics
+    )
+    result["setup_physics"], _ = timed(game.setup_physics)
+
+    # maker: load the same level, then place and delete tiles with SPACE
+    maker = main.MakerView()
+    maker.tile_physics = args.tile_physics
+    maker_level = level.from_simulation(game.simulation)
+    result["maker_load"], _ = timed(maker.load_level, maker_level)
+    cells = [
+        (rng.randrange(columns), rng.randrange(1, rows)) for _ in range(args.edits)
+    ]
+
+    def edit(texture_index):
+        maker.builder.cur_texture_index = texture_index
+        for column, row in cells:
+            maker.builder.position = level.tile_center(column, row)
+            maker.handle_key_press(arcade.key.SPACE)
+
+    result["maker_place"], _ = timed(edit, 1)
+    result["maker_place"] /= args.edits
+    result["maker_delete"], _ = timed(edit, 4)
+    result["maker_delete"] /= args.edits
+
+    # ENTER: restart the game on the edited level, as run() does
+    def play_start():
+        play = maker.play()
+        play.setup_physics()
+        return play
+
+    result["play_start"], play = timed(play_start)
+
+    window.show_view(play)
+    play.on_key_press(arcade.key.RIGHT, 0)
+    ticks = time_ticks(lambda: play.on_update(1 / 60), args.ticks)
+    result["tick_mean"], result["tick_p95"] = ticks["mean"], ticks["p95"]
+    sim_ticks = time_ticks(lambda: play.simulation.step(), args.ticks)
+    result["sim_tick_mean"] = sim_ticks["mean"]
+    return result
+
+
+def compare(results: dict, baseline: dict, threshold) -> list[str]:
+    """List every metric that got slower than [threshold] times its baseline."""
+    regressions = []
+    for size, metrics in results["results"].items():
+        base = baseline["results"].get(size)
+        if base is None:
+            continue
+        for name, value in metrics.items():
+            if name in ("tiles", "level_width") or not base.get(name):
+                continue
+            ratio = value / base[name]
+            print(f"{size:>9} {name:<15} {value:12.6f}s  x{ratio:.2f}")
+            if ratio > threshold:
+                regressions.append(f"{size} {name}: x{ratio:.2f}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.headless:
+        os.environ["ARCADE_HEADLESS"] = "1"
+    baseline = None
+    if args.baseline:
+        if os.path.abspath(args.output) == os.path.abspath(args.baseline):
+            print("--output would overwrite the baseline; pick another file")
+            return 2
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "density": args.density,
+            "ticks": args.ticks,
+            "edits": args.edits,
+            "seed": args.seed,
+            "tile_physics": args.tile_physics,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        # each size gets its own stream so adding sizes doesn't change the others
+        rng = random.Random(args.seed * 1_000_003 + size)
+        results["results"][str(size)] = bench_size(args, size, rng)
+        print(json.dumps({size: results["results"][str(size)]}))
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("regressions:", *regressions, sep="\n  ")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,44 +1,58 @@
-import os
 import arcade
+import math
 import random
+import numpy as np
+import assets
 import view
+from animation import AnimatedSprite, Animation
+from parallax import FG_STAR_COLORS, ParallaxLayer
+from profiler import FrameProfiler, ProfilerOverlay
 
-bg_star_color = (255, 255, 255, 95)
-fg_star_color = [
-    arcade.color.WHITE,
-    arcade.color.BABY_BLUE,
-    arcade.color.AQUA,
-    arcade.color.BUFF,
-    arcade.color.ALIZARIN_CRIMSON,
-]
-
-
-def create_starfield(
-    width,
-    height,
-    batch: arcade.shape_list.ShapeElementList,
-    color=bg_star_color,
-    random_color=False,
-):
-    for i in range(200):
-        x = random.randint(0, width)
-        y = random.randint(0, height)
-        w = random.randint(1, 3)
-        h = random.randint(1, 3)
-        if random_color:
-            color = random.choice(fg_star_color)
-        star = arcade.shape_list.create_rectangle_filled(x, y, w, h, color)
-        batch.append(star)
-
+fg_star_color = FG_STAR_COLORS
 
 CAMERA_PAN_SPEED = 0.3
 FONT_SIZE = 16
+COLUMN_WIDTH = 320  # width of the x-columns entities are bucketed into
+CHUNK_WIDTH = 640  # width of the static layer's chunks
+ACTIVE_MARGIN = 320  # extra width kept active on each side of the view
+PROFILE_PATH = "profile"  # F4 writes profile.csv and profile.json
+UPDATE_RATE = 1 / 60  # fixed simulation tick, independent of the display rate
+MAX_STEPS_PER_FRAME = 5  # catch-up limit; further lag slows the game down
+SNAP_DISTANCE = 160  # px per tick; longer moves (respawns) aren't interpolated
+
+# level grid used by the maker and level files
+TILE_SIZE = 40
+COIN_SCALE = TILE_SIZE / 64 - 0.05  # slightly smaller than tile
+ENEMY_SCALE = TILE_SIZE / 128
+PLAYER_SCALE = 80 / 92  # two tile height
+WALL_CHUNK = CHUNK_WIDTH // TILE_SIZE  # tile columns merged into walls together
+
+# moving enemies
+PATROL = "patrol"  # walks, turning at walls and ledges
+JUMP = "jump"  # walks and hops at a fixed interval, off ledges too
+ENEMY_SPEED = 2
+ENEMY_JUMP_SPEED = 14
+ENEMY_JUMP_INTERVAL = 90  # ticks
+EDGE_SLACK = 0.01  # px; covers rounding between hit box edges and NumPy offsets
+# per-enemy MovingEnemies arrays that change during play
+STATE = (
+    "x",
+    "y",
+    "vx",
+    "vy",
+    "on_ground",
+    "defeated",
+    "fallen",
+    "pushed_x",
+    "previous_x",
+    "previous_y",
+)
 
 
-class Player(arcade.Sprite):
+class Player(AnimatedSprite):
     def __init__(
         self,
-        animations: dict[str, list[arcade.Texture]],
+        animations: dict[str, Animation],
         scale,
         jumps,
         jump_speed,
@@ -46,22 +60,17 @@ class Player(arcade.Sprite):
         start_x,
         start_y,
     ):
-        super().__init__(animations["idle"][0])
-        self.animations = animations
-        self.textures = animations["idle"]
+        # states: 'idle', 'walk', 'jump', 'fall', 'duck'
+        super().__init__(animations, "idle", scale)
         self.scale_factor = scale
-        self.scale = scale
         self.jumps = jumps
         self.jump_speed = jump_speed
         self.movement_speed = movement_speed
         self.start_x = start_x
         self.start_y = start_y
 
-        self.state = "idle"  # 'idle', 'walk', 'jump', 'fall', 'duck'
         self.on_ground = True
         self.time_since_ground = 0
-        self.time_elapsed = 0
-        self.frame_rate = 0.1
         # track key presses for horizontal movement + duck after jump
         self.key_pressed = {"left": False, "right": False, "down": False}
         self.last_key_pressed = None
@@ -69,26 +78,24 @@ class Player(arcade.Sprite):
         self.attacking = False
         self.attack_time = 0
 
-    def set_state(self, new_state):
-        if self.state != new_state:
-            self.state = new_state
-            self.textures = self.animations[new_state]
-            self.cur_texture_index = 0
-            self.set_texture(self.cur_texture_index)
-            self.hit_box = arcade.hitbox.HitBox(
-                self.texture.hit_box_points,
-                (self.center_x, self.center_y),
-                (self.scale_factor, self.scale_factor),
-            )
+    def reset(self) -> None:
+        """Back to the start position, standing still and facing right."""
+        self.position = self.start_x, self.start_y
+        self.change_x = 0
+        self.change_y = 0
+        self.scale_x = self.scale_factor
+        self.state = None  # make set_state refresh the texture and hitbox
+        self.set_state("idle")
+        self.on_ground = True
+        self.time_since_ground = 0
+        self.key_pressed = {"left": False, "right": False, "down": False}
+        self.last_key_pressed = None
+        self.attacking = False
+        self.attack_time = 0
+        self.color = 255, 255, 255, 255
 
     def update(self, delta_time=1 / 60, *args, **kwargs) -> None:
-        self.time_elapsed += delta_time
-        if self.time_elapsed > self.frame_rate:
-            if self.cur_texture_index < len(self.textures):
-                self.cur_texture_index = (self.cur_texture_index + 1) % len(
-                    self.textures
-                )
-                self.set_texture(self.cur_texture_index)
+        self.update_animation(delta_time)
 
         if self.key_pressed["down"]:
             # duck only on ground
@@ -163,18 +170,9 @@ def make_player(
     scale=1.0, start_x=100, start_y=200, jumps=2, jump_speed=20, movement_speed=8
 ) -> Player:
     """Precondition: jumps > 0."""
-    walk = []
-    for filename in sorted(os.listdir("assets/images/walk")):
-        walk.append(arcade.load_texture(f"assets/images/walk/{filename}"))
-    # walk = arcade.load_spritesheet("assets/images/p1_walk.png").get_texture_grid(size=(72, 97), columns=3, count=11)
-    # ^^^ p1_walk.png doesn't have the images in an even grid ^^^
-    animations = {
-        "idle": [arcade.load_texture("assets/images/p1_stand.png")],
-        "walk": walk,
-        "duck": [arcade.load_texture("assets/images/p1_duck.png")],
-        "jump": [arcade.load_texture("assets/images/p1_jump.png")],
-        "fall": [arcade.load_texture("assets/images/p1_fall.png")],
-    }
+    # p1_walk.png isn't an even grid, so the walk frames are packed from
+    # assets/images/walk into the texture atlas instead (see atlas.py)
+    animations = assets.player_animations()
     player = Player(
         animations, scale, jumps, jump_speed, movement_speed, start_x, start_y
     )
@@ -182,104 +180,937 @@ def make_player(
     return player
 
 
-class GameView(arcade.View):
-    def __init__(
-        self,
-        window: arcade.Window,
-        level_width,
-        parallax_scroll,
-        player: Player,
-        gravity,
-    ) -> None:
-        super().__init__()
-        self.window = window
-        self.level_width = level_width
-        self.parallax_scroll = parallax_scroll
+def merge_tiles(tiles) -> list[tuple[int, int, int, int]]:
+    """Greedily merge grid tiles into as few rectangles as possible.
+
+    Takes (tile_x, tile_y) pairs and returns (tile_x, tile_y, width, height)
+    rectangles in tiles, growing each one right along its row and then up.
+    """
+    remaining = set(tiles)
+    rects = []
+    for tile_x, tile_y in sorted(remaining, key=lambda tile: (tile[1], tile[0])):
+        if (tile_x, tile_y) not in remaining:
+            continue
+        width = 1
+        while (tile_x + width, tile_y) in remaining:
+            width += 1
+        height = 1
+        while all(
+            (x, tile_y + height) in remaining for x in range(tile_x, tile_x + width)
+        ):
+            height += 1
+        for y in range(tile_y, tile_y + height):
+            for x in range(tile_x, tile_x + width):
+                remaining.discard((x, y))
+        rects.append((tile_x, tile_y, width, height))
+    return rects
+
+
+def make_walls(tiles) -> list[arcade.Sprite]:
+    """Collision rectangles for platform [tiles], merged with merge_tiles()."""
+    return [
+        arcade.SpriteSolidColor(
+            width=width * TILE_SIZE,
+            height=height * TILE_SIZE,
+            center_x=(tile_x + width / 2) * TILE_SIZE,
+            center_y=(tile_y + height / 2) * TILE_SIZE,
+            color=arcade.color.YELLOW,
+        )
+        for tile_x, tile_y, width, height in merge_tiles(tiles)
+    ]
+
+
+def grid_tile(sprite: arcade.BasicSprite) -> tuple[int, int] | None:
+    """The (tile_x, tile_y) that [sprite] exactly covers, or None if it's off the grid."""
+    tile_x = (sprite.center_x - TILE_SIZE / 2) / TILE_SIZE
+    tile_y = (sprite.center_y - TILE_SIZE / 2) / TILE_SIZE
+    if (
+        sprite.width == TILE_SIZE
+        and sprite.height == TILE_SIZE
+        and tile_x.is_integer()
+        and tile_y.is_integer()
+    ):
+        return int(tile_x), int(tile_y)
+    return None
+
+
+def grid_at(grid: np.ndarray, columns, rows) -> np.ndarray:
+    """Cells of a (column, row) [grid] padded with one cell on every side.
+
+    [columns] and [rows] are tile coordinates; cells outside the grid read
+    the padding.
+    """
+    height = grid.shape[1]
+    rows = np.minimum(np.maximum(rows + 1, 0), height - 1)
+    # out-of-range columns clip to the padding at either end
+    return grid.ravel().take((columns + 1) * height + rows, mode="clip")
+
+
+def remove_sprites(sprite_list: arcade.SpriteList, sprites) -> None:
+    """Remove many sprites with one pass over the list instead of one per sprite."""
+    removed = set(sprites)
+    if len(removed) < 16:
+        for sprite in removed:
+            sprite_list.remove(sprite)
+        return
+    kept = [sprite for sprite in sprite_list if sprite not in removed]
+    sprite_list.clear()
+    sprite_list.extend(kept)
+
+
+def rehash(sprite_list: arcade.SpriteList) -> None:
+    """Rebuild a spatial hash, which keeps every cell it has ever touched."""
+    if sprite_list.spatial_hash is not None:
+        cell_size = sprite_list.spatial_hash.cell_size
+        sprite_list.disable_spatial_hashing()
+        sprite_list.enable_spatial_hashing(cell_size)
+
+
+class ActiveRegion:
+    """Sprites bucketed by x-column; only columns near the camera are kept in [active].
+
+    A sprite spanning several columns is active while any of them is.
+    """
+
+    def __init__(self, column_width=COLUMN_WIDTH, use_spatial_hash=False) -> None:
+        self.column_width = column_width
+        self.buckets: dict[int, list[arcade.Sprite]] = {}
+        self.active = arcade.SpriteList(use_spatial_hash=use_spatial_hash)
+        self.columns = range(0)
+        # number of active columns each active sprite is in
+        self.counts: dict[arcade.Sprite, int] = {}
+        # active sprites with frames to play; static ones are never updated
+        self.animated: dict[arcade.Sprite, None] = {}
+
+    def sprite_columns(self, sprite: arcade.Sprite) -> range:
+        return range(
+            int(sprite.left // self.column_width),
+            int(sprite.right // self.column_width) + 1,
+        )
+
+    def add(self, sprite: arcade.Sprite) -> None:
+        for column in self.sprite_columns(sprite):
+            self.buckets.setdefault(column, []).append(sprite)
+            if column in self.columns:
+                self._activate(sprite)
+
+    def extend(self, sprites) -> None:
+        for sprite in sprites:
+            self.add(sprite)
+
+    def remove_many(self, sprites) -> None:
+        """Remove several sprites, filtering each affected bucket once."""
+        removed = set(sprites)
+        columns = set()
+        for sprite in removed:
+            columns.update(self.sprite_columns(sprite))
+            if sprite in self.counts:
+                del self.counts[sprite]
+                self.active.remove(sprite)
+                self.animated.pop(sprite, None)
+        for column in columns:
+            self.buckets[column] = [
+                sprite for sprite in self.buckets[column] if sprite not in removed
+            ]
+
+    def move(self, sprite: arcade.Sprite, center_x, center_y) -> None:
+        """Move [sprite], re-bucketing it if it changed columns."""
+        old = self.sprite_columns(sprite)
+        sprite.position = center_x, center_y
+        new = self.sprite_columns(sprite)
+        if new == old:
+            return
+        # activate before deactivating so a sprite staying active isn't
+        # removed from and re-added to the active list
+        for column in new:
+            if column not in old:
+                self.buckets.setdefault(column, []).append(sprite)
+                if column in self.columns:
+                    self._activate(sprite)
+        for column in old:
+            if column not in new:
+                self.buckets[column].remove(sprite)
+                if column in self.columns:
+                    self._deactivate(sprite)
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.counts.clear()
+        self.animated.clear()
+        self.active.clear()
+        self.columns = range(0)
+
+    def compact(self) -> None:
+        """Drop empty buckets and spatial hash cells, which are otherwise kept."""
+        self.buckets = {column: b for column, b in self.buckets.items() if b}
+        rehash(self.active)
+
+    def update(self, left, right) -> None:
+        """Make the columns overlapping [left, right] active."""
+        columns = range(
+            int(left // self.column_width), int(right // self.column_width) + 1
+        )
+        if columns == self.columns:
+            return
+        for column in self.columns:
+            if column not in columns:
+                for sprite in self.buckets.get(column, ()):
+                    self._deactivate(sprite)
+        for column in columns:
+            if column not in self.columns:
+                for sprite in self.buckets.get(column, ()):
+                    self._activate(sprite)
+        self.columns = columns
+
+    def update_animation(self, delta_time) -> None:
+        """Advance the active sprites that have more than one frame."""
+        for sprite in self.animated:
+            sprite.update_animation(delta_time)
+
+    def _activate(self, sprite: arcade.Sprite) -> None:
+        count = self.counts.get(sprite, 0)
+        if count == 0:
+            self.active.append(sprite)
+            if isinstance(sprite, AnimatedSprite) and sprite.animated:
+                self.animated[sprite] = None
+        self.counts[sprite] = count + 1
+
+    def _deactivate(self, sprite: arcade.Sprite) -> None:
+        count = self.counts[sprite]
+        if count == 1:
+            del self.counts[sprite]
+            self.active.remove(sprite)
+            self.animated.pop(sprite, None)
+        else:
+            self.counts[sprite] = count - 1
+
+
+class StaticLayer:
+    """Sprites that stay put, drawn from a fixed sprite list per x-chunk.
+
+    A chunk's list only changes when sprites are added to or removed from it,
+    so its vertex buffer is built once per edit rather than per frame, and
+    only the chunks overlapping the view are drawn.
+    """
+
+    def __init__(self, chunk_width=CHUNK_WIDTH) -> None:
+        self.chunk_width = chunk_width
+        self.chunks: dict[int, arcade.SpriteList] = {}
+        # the chunk each sprite was added to, whether or not it moved since
+        self.keys: dict[arcade.BasicSprite, int] = {}
+        # half the widest sprite's width: how far past the view a chunk's
+        # sprites can reach into it
+        self.reach = 0.0
+        # tiles per chunk whose sprites aren't made until the chunk is drawn,
+        # and the function that makes them
+        self.pending: dict[int, list[tuple[int, int]]] = {}
+        self.make_sprites = None
+
+    def __len__(self) -> int:
+        return len(self.keys) + sum(map(len, self.pending.values()))
+
+    def __iter__(self):
+        """Every sprite in the layer, making any still pending."""
+        for key in list(self.pending):
+            self.make_chunk(key)
+        return iter(self.keys)
+
+    def defer(self, tiles, make_sprites) -> None:
+        """Add sprites for [tiles] (tile_x, tile_y), made by [make_sprites]
+        (a list of tiles -> sprites) only once their chunk is drawn."""
+        self.make_sprites = make_sprites
+        for tile in tiles:
+            key = int((tile[0] + 0.5) * TILE_SIZE // self.chunk_width)
+            self.pending.setdefault(key, []).append(tile)
+        if self.pending:
+            self.reach = max(self.reach, TILE_SIZE / 2)
+
+    def make_chunk(self, key) -> None:
+        tiles = self.pending.pop(key, None)
+        if tiles:
+            self.extend(self.make_sprites(tiles))
+
+    def extend(self, sprites) -> None:
+        added = {}
+        for sprite in sprites:
+            key = int(sprite.center_x // self.chunk_width)
+            self.keys[sprite] = key
+            added.setdefault(key, []).append(sprite)
+            self.reach = max(self.reach, sprite.width / 2)
+        for key, chunk_sprites in added.items():
+            if key not in self.chunks:
+                self.chunks[key] = arcade.SpriteList()
+            self.chunks[key].extend(chunk_sprites)
+
+    def remove_many(self, sprites) -> None:
+        removed = {}
+        for sprite in sprites:
+            removed.setdefault(self.keys.pop(sprite), []).append(sprite)
+        for key, chunk_sprites in removed.items():
+            chunk = self.chunks[key]
+            remove_sprites(chunk, chunk_sprites)
+            if not chunk:
+                del self.chunks[key]
+
+    def clear(self) -> None:
+        self.chunks.clear()
+        self.keys.clear()
+        self.pending.clear()
+        self.reach = 0.0
+
+    def draw(self, left, right) -> None:
+        """Draw the chunks that can overlap [left, right]."""
+        first = int((left - self.reach) // self.chunk_width)
+        last = int((right + self.reach) // self.chunk_width)
+        for key in range(first, last + 1):
+            if key in self.pending:
+                self.make_chunk(key)
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                chunk.draw()
+
+
+class MovingEnemies:
+    """Patrolling and jumping enemies stepped together with NumPy.
+
+    Positions, velocities and patrol bounds live in arrays and are moved in
+    one vectorized pass against an occupancy grid of the platform tiles.
+    Only sprites near the active region (or crossing a column) get their
+    positions written back, so inactive enemies cost no Python work.
+    """
+
+    def __init__(self, region: ActiveRegion, gravity, level_width) -> None:
+        self.region = region
         self.gravity = gravity
+        self.level_width = level_width
+        # (sprite, movement, speed, jump speed, left, right, spawn x, spawn y)
+        self.records = []
+        self.index: dict[arcade.Sprite, int] = {}
+        self.sprites = []
+        self.dirty = False
+        # number of platforms covering each cell, padded with an empty cell
+        # on every side; grown upward as platforms are added
+        columns = int(np.ceil(level_width / TILE_SIZE))
+        self.solid = np.zeros((columns + 2, 3), np.int32)
+        # optional object whose solid_at(columns, rows) is used instead of
+        # the rasterized cells, such as a chunked world
+        self.grid = None
+        self.size = 0
+        self.arrays()
 
-        if self.parallax_scroll:
-            self.fg_star_speed = 0.6
-            self.bg_star_speed = 0.8
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def movement(self, sprite: arcade.Sprite):
+        """PATROL, JUMP, or None if [sprite] isn't a moving enemy."""
+        i = self.index.get(sprite)
+        return None if i is None else self.records[i][1]
 
-            self.fg_stars = arcade.shape_list.ShapeElementList()
-            create_starfield(
-                self.level_width, window.height, self.fg_stars, random_color=True
+    def add(
+        self,
+        sprites,
+        movement=PATROL,
+        speed=ENEMY_SPEED,
+        jump_speed=ENEMY_JUMP_SPEED,
+        left=None,
+        right=None,
+    ) -> None:
+        """Start moving [sprites], which must be in the region; bounds default to
+        the whole level."""
+        for sprite in sprites:
+            self.index[sprite] = len(self.records)
+            self.records.append(
+                (sprite, movement, speed, jump_speed, left, right, *sprite.position)
             )
+        self.dirty = True
+
+    def remove(self, sprites) -> None:
+        removed = {sprite for sprite in sprites if sprite in self.index}
+        if removed:
+            self.records = [r for r in self.records if r[0] not in removed]
+            self.index = {r[0]: i for i, r in enumerate(self.records)}
+            self.dirty = True
+
+    def fill(self, tiles, platforms, count=1) -> None:
+        """Rasterize [tiles] (tile_x, tile_y) and other [platforms] sprites,
+        adding [count] (-1 to take them away again) to the cells they cover."""
+        rows = max([tile_y for _, tile_y in tiles] + [0]) + 1
+        for platform in platforms:
+            rows = max(rows, int(np.ceil(platform.top / TILE_SIZE)))
+        if rows + 2 > self.solid.shape[1]:
+            # the old top padding row is empty, so it becomes a row as is
+            solid = np.zeros((self.solid.shape[0], rows + 2), self.solid.dtype)
+            solid[:, : self.solid.shape[1]] = self.solid
+            self.solid = solid
+        columns = self.solid.shape[0] - 2
+        if tiles:
+            cells = np.array(tiles) + 1
+            inside = (cells[:, 0] > 0) & (cells[:, 0] <= columns) & (cells[:, 1] > 0)
+            np.add.at(self.solid, (cells[inside, 0], cells[inside, 1]), count)
+        for platform in platforms:
+            left = max(int(platform.left // TILE_SIZE), 0)
+            right = min(int(np.ceil(platform.right / TILE_SIZE)), columns)
+            bottom = max(int(platform.bottom // TILE_SIZE), 0)
+            top = int(np.ceil(platform.top / TILE_SIZE))
+            self.solid[left + 1 : right + 1, bottom + 1 : top + 1] += count
+
+    def solid_at(self, columns, rows) -> np.ndarray:
+        if self.grid is not None:
+            return self.grid.solid_at(columns, rows)
+        return grid_at(self.solid, columns, rows) > 0
 
-            self.bg_stars = arcade.shape_list.ShapeElementList()
-            create_starfield(self.level_width, window.height, self.bg_stars)
+    def arrays(self) -> None:
+        """Rebuild the state arrays from the records after adds/removes.
 
+        Enemies that were already moving keep their state; new ones start at rest.
+        """
+        previous = {sprite: i for i, sprite in enumerate(self.sprites)}
+        state = [getattr(self, name) for name in STATE] if previous else []
+        records = self.records
+        self.size = len(records)
+        self.sprites = [r[0] for r in records]
+
+        def column(values) -> np.ndarray:
+            return np.array(values, float)
+
+        self.x = column([sprite.center_x for sprite in self.sprites])
+        self.y = column([sprite.center_y for sprite in self.sprites])
+        self.spawn_x = column([r[6] for r in records])
+        self.spawn_y = column([r[7] for r in records])
+        self.speed = column([r[2] for r in records])
+        self.jump_speed = column([r[3] for r in records])
+        self.jumper = np.array([r[1] == JUMP for r in records], bool)
+        self.patrol = ~self.jumper
+        self.left_offset = column([s.left - s.center_x for s in self.sprites])
+        self.right_offset = column([s.right - s.center_x for s in self.sprites])
+        self.bottom_offset = column([s.bottom - s.center_y for s in self.sprites])
+        self.top_offset = column([s.top - s.center_y for s in self.sprites])
+        # bounds on the center; by default they keep the enemy inside the level
+        self.left = column(
+            [
+                -offset if r[4] is None else r[4]
+                for r, offset in zip(records, self.left_offset.tolist())
+            ]
+        )
+        self.right = column(
+            [
+                self.level_width - offset if r[5] is None else r[5]
+                for r, offset in zip(records, self.right_offset.tolist())
+            ]
+        )
+        # spread the jumpers' timing by spawn column
+        self.phase = (self.spawn_x // TILE_SIZE).astype(int)
+        self.dirty = False
+        self.restart()
+        kept = [(i, previous[s]) for i, s in enumerate(self.sprites) if s in previous]
+        if kept and state:
+            new, old = np.array(kept).T
+            for name, values in zip(STATE, state):
+                getattr(self, name)[new] = values[old]
+
+    def restart(self) -> None:
+        self.vx = self.speed.copy()
+        self.vy = np.zeros(self.size)
+        self.on_ground = np.zeros(self.size, bool)
+        self.defeated = np.zeros(self.size, bool)
+        self.fallen = np.zeros(self.size, bool)
+        # positions last written to the sprites
+        self.pushed_x = self.x.copy()
+        # positions before the last tick, for interpolated rendering
+        self.previous_x = self.x.copy()
+        self.previous_y = self.y.copy()
+
+    def defeat(self, sprites) -> None:
+        """Stop moving [sprites], which were taken out of the region."""
+        for sprite in sprites:
+            i = self.index.get(sprite)
+            if i is not None:
+                self.defeated[i] = True
+
+    def reset(self) -> None:
+        """Put every enemy back at its spawn; defeated ones are re-added later."""
+        if self.dirty:
+            self.arrays()
+        for i, sprite in enumerate(self.sprites):
+            if self.defeated[i]:
+                sprite.position = self.spawn_x[i], self.spawn_y[i]
+            else:
+                self.region.move(sprite, self.spawn_x[i], self.spawn_y[i])
+        self.x = self.spawn_x.copy()
+        self.y = self.spawn_y.copy()
+        self.restart()
+
+    def update(self, tick) -> None:
+        if self.dirty:
+            self.arrays()
+        if not self.size:
+            return
+        self.previous_x, self.previous_y = self.x, self.y
+        self.x, self.y, self.vx, self.vy, self.on_ground = self.move(
+            self.x, self.y, self.vx, self.vy, self.on_ground, tick
+        )
+        # defeated and fallen enemies keep being stepped but are never pushed
+        self.fallen |= self.y + self.top_offset < 0
+        self.push(~(self.defeated | self.fallen))
+
+    def move(self, x, y, vx, vy, on_ground, tick) -> tuple[np.ndarray, ...]:
+        """One tick of movement from the given state at [tick].
+
+        Returns the new x, y, vx, vy and on-ground arrays. The state arrays may
+        have extra leading axes, such as one per batch.py instance.
+        """
+        vy = np.maximum(vy - self.gravity, 1 - TILE_SIZE)  # no tunneling
+
+        # walk, turning at walls, patrol bounds and (for patrols) ledges
+        new_x = x + vx
+        lead = np.floor(
+            (new_x + np.where(vx > 0, self.right_offset, self.left_offset)) / TILE_SIZE
+        ).astype(int)
+        row = np.floor(y / TILE_SIZE).astype(int)
+        foot = np.floor((y + self.bottom_offset - 1) / TILE_SIZE).astype(int)
+        turn = (
+            self.solid_at(lead, row)
+            | (new_x < self.left)
+            | (new_x > self.right)
+            | (self.patrol & on_ground & ~self.solid_at(lead, foot))
+        )
+        vx = np.where(turn, -vx, vx)
+        new_x = np.where(turn, x, new_x)
+
+        # fall or rise, landing on or bumping into tiles under both corners
+        new_y = y + vy
+        left = np.floor((new_x + self.left_offset + 1) / TILE_SIZE).astype(int)
+        right = np.floor((new_x + self.right_offset - 1) / TILE_SIZE).astype(int)
+        foot = np.floor((new_y + self.bottom_offset) / TILE_SIZE).astype(int)
+        land = (vy <= 0) & (self.solid_at(left, foot) | self.solid_at(right, foot))
+        new_y = np.where(land, (foot + 1) * TILE_SIZE - self.bottom_offset, new_y)
+        head = np.floor((new_y + self.top_offset) / TILE_SIZE).astype(int)
+        bump = (vy > 0) & (self.solid_at(left, head) | self.solid_at(right, head))
+        new_y = np.where(bump, head * TILE_SIZE - self.top_offset, new_y)
+        vy = np.where(land | bump, 0.0, vy)
+        jump = self.jumper & land & ((tick + self.phase) % ENEMY_JUMP_INTERVAL == 0)
+        vy = np.where(jump, self.jump_speed, vy)
+        return new_x, new_y, vx, vy, land
+
+    def push(self, moving) -> None:
+        """Write positions to the sprites that are (or may become) active or
+        that may have crossed a column boundary since they were last written."""
+        width = self.region.column_width
+        columns = self.region.columns
+        near = (self.x + self.right_offset >= (columns.start - 1) * width) & (
+            self.x + self.left_offset < (columns.stop + 1) * width
+        )
+        crossed = np.zeros(self.size, bool)
+        for offset in (self.left_offset, self.right_offset):
+            low = np.minimum(self.x, self.pushed_x) + offset - EDGE_SLACK
+            high = np.maximum(self.x, self.pushed_x) + offset + EDGE_SLACK
+            crossed |= np.floor(low / width) != np.floor(high / width)
+        crossed &= moving
+        near &= moving & ~crossed
+        sprites = self.sprites
+        # crossing sprites may change buckets; the others only need positions
+        for i, center_x, center_y in self.take(crossed):
+            self.region.move(sprites[i], center_x, center_y)
+        for i, center_x, center_y in self.take(near):
+            sprites[i].position = center_x, center_y
+
+    def interpolate(self, sprites, alpha) -> list[tuple[arcade.Sprite, float, float]]:
+        """(sprite, x, y) of the moving enemies among [sprites], [alpha] of the
+        way from their position before the last tick to their current one."""
+        if self.dirty or not self.size:
+            return []
+        indices = [self.index[s] for s in sprites if s in self.index]
+        indices = [i for i in indices if not self.fallen[i]]
+        if not indices:
+            return []
+        x0, y0 = self.previous_x[indices], self.previous_y[indices]
+        x1, y1 = self.x[indices], self.y[indices]
+        # longer moves are respawns, drawn where they ended
+        snap = np.abs(x1 - x0) + np.abs(y1 - y0) > SNAP_DISTANCE
+        x = np.where(snap, x1, x0 + (x1 - x0) * alpha)
+        y = np.where(snap, y1, y0 + (y1 - y0) * alpha)
+        return list(zip([self.sprites[i] for i in indices], x.tolist(), y.tolist()))
+
+    def take(self, mask) -> zip:
+        """(index, x, y) of the enemies in [mask], marking their positions pushed."""
+        indices = np.flatnonzero(mask)
+        self.pushed_x[indices] = self.x[indices]
+        return zip(indices.tolist(), self.x[indices].tolist(), self.y[indices].tolist())
+
+
+class TileOccupancy:
+    """Solid tiles as a bitmap: one integer per tile column, one bit per row.
+
+    Walls are rounded out to the tiles they cover; rows below 0 are dropped.
+    """
+
+    def __init__(self) -> None:
+        self.columns: dict[int, int] = {}
+
+    def clear(self) -> None:
+        self.columns.clear()
+
+    def tiles(self, wall: arcade.BasicSprite) -> tuple[range, int]:
+        """The columns [wall] covers and the bit mask of its rows."""
+        bottom = max(int(wall.bottom // TILE_SIZE), 0)
+        top = int(np.ceil(wall.top / TILE_SIZE))
+        columns = range(
+            int(wall.left // TILE_SIZE), int(np.ceil(wall.right / TILE_SIZE))
+        )
+        return columns, ((1 << max(top - bottom, 0)) - 1) << bottom
+
+    def add(self, walls) -> None:
+        for wall in walls:
+            columns, mask = self.tiles(wall)
+            for column in columns:
+                self.columns[column] = self.columns.get(column, 0) | mask
+
+    def remove(self, walls) -> None:
+        for wall in walls:
+            columns, mask = self.tiles(wall)
+            for column in columns:
+                remaining = self.columns.get(column, 0) & ~mask
+                if remaining:
+                    self.columns[column] = remaining
+                else:
+                    self.columns.pop(column, None)
+
+    def any(self, left, right, bottom, top) -> bool:
+        """Whether any tile in columns [left, right] and rows [bottom, top] is solid."""
+        bottom = max(bottom, 0)
+        if top < bottom:
+            return False
+        mask = ((1 << (top - bottom + 1)) - 1) << bottom
+        columns = self.columns
+        return any(columns.get(column, 0) & mask for column in range(left, right + 1))
+
+
+def tile_span(low, high) -> tuple[int, int]:
+    """First and last tile a [low, high) pixel range covers."""
+    return math.floor(low / TILE_SIZE), math.ceil(high / TILE_SIZE) - 1
+
+
+class TilePhysicsEngine:
+    """Moves the player against a TileOccupancy instead of platform sprites.
+
+    A stand-in for arcade.PhysicsEnginePlatformer on grid-aligned levels, with
+    the same jump counting. The player's hit box is taken as its bounding
+    rectangle and moved on y, then on x, testing only the few tiles at its
+    leading edge, so a step costs the same however many platforms there are.
+    """
+
+    def __init__(
+        self, player_sprite: arcade.Sprite, tiles: TileOccupancy, gravity_constant=0.5
+    ) -> None:
+        self.player_sprite = player_sprite
+        self.tiles = tiles
+        self.gravity_constant = gravity_constant
+        self.allow_multi_jump = False
+        self.allowed_jumps = 1
+        self.jumps_since_ground = 0
+
+    def blocked(self, left, right, bottom, top) -> bool:
+        """Whether a box with these pixel edges overlaps a solid tile."""
+        return self.tiles.any(*tile_span(left, right), *tile_span(bottom, top))
+
+    def can_jump(self, y_distance=5) -> bool:
+        """True on the ground (within [y_distance] below the player's feet) or
+        with multi-jumps left; touching the ground resets the jump count."""
+        sprite = self.player_sprite
+        ground = self.blocked(
+            sprite.left, sprite.right, sprite.bottom - y_distance, sprite.bottom
+        )
+        if ground:
+            self.jumps_since_ground = 0
+        return ground or (
+            self.allow_multi_jump and self.jumps_since_ground < self.allowed_jumps
+        )
+
+    def enable_multi_jump(self, allowed_jumps) -> None:
+        self.allowed_jumps = allowed_jumps
+        self.allow_multi_jump = True
+
+    def disable_multi_jump(self) -> None:
+        self.allow_multi_jump = False
+        self.allowed_jumps = 1
+        self.jumps_since_ground = 0
+
+    def jump(self, velocity) -> None:
+        self.player_sprite.change_y = velocity
+        self.increment_jump_counter()
+
+    def increment_jump_counter(self) -> None:
+        if self.allow_multi_jump:
+            self.jumps_since_ground += 1
+
+    def update(self) -> None:
+        """Apply gravity and move the player, stopping it at solid tiles.
+
+        Moves are capped below a tile per tick, so nothing is tunneled through.
+        """
+        sprite = self.player_sprite
+        sprite.change_y -= self.gravity_constant
+        x, y = sprite.position
+        left, right = sprite.left - x, sprite.right - x
+        bottom, top = sprite.bottom - y, sprite.top - y
+        limit = TILE_SIZE - 1
+
+        dy = min(max(sprite.change_y, -limit), limit)
+        y += dy
+        first, last = tile_span(x + left, x + right)
+        if dy < 0:
+            row = math.floor((y + bottom) / TILE_SIZE)
+            if self.tiles.any(first, last, row, row):
+                y = (row + 1) * TILE_SIZE - bottom
+                sprite.change_y = 0.0
+        elif dy > 0:
+            row = math.ceil((y + top) / TILE_SIZE) - 1
+            if self.tiles.any(first, last, row, row):
+                y = row * TILE_SIZE - top
+                sprite.change_y = 0.0
+        y = round(y, 2)
+
+        dx = min(max(sprite.change_x, -limit), limit)
+        if dx:
+            x += dx
+            bottom_row, top_row = tile_span(y + bottom, y + top)
+            if dx > 0:
+                column = math.ceil((x + right) / TILE_SIZE) - 1
+            else:
+                column = math.floor((x + left) / TILE_SIZE)
+            if self.tiles.any(column, column, bottom_row, top_row):
+                # ledges lower than the step are climbed, as with ramp_up
+                rise = abs(dx)
+                if not self.blocked(
+                    x + left, x + right, y + bottom + rise, y + top + rise
+                ):
+                    y = math.ceil((y + bottom) / TILE_SIZE) * TILE_SIZE - bottom
+                elif dx > 0:
+                    x = column * TILE_SIZE - right
+                else:
+                    x = (column + 1) * TILE_SIZE - left
+        sprite.position = x, y
+
+
+class Simulation:
+    """Window-free game state: player, level sprites, physics and counters.
+
+    Can be stepped without a GL context, e.g. for headless regression runs.
+    """
+
+    def __init__(
+        self,
+        player: Player,
+        level_width,
+        gravity,
+        update_rate=UPDATE_RATE,
+        view_width=800,
+        tile_physics=False,
+    ):
         self.player = player
-        self.sprites = arcade.SpriteList()
-        self.sprites.append(self.player)
+        self.level_width = level_width
+        self.gravity = gravity
+        self.update_rate = update_rate
+        self.view_width = view_width
+        self.tile_physics = tile_physics
+
+        # every enemy and coin in play, in the order added; dicts rather than
+        # sprite lists, so removing a few doesn't touch the rest of the level
+        self.enemy_sprites: dict[arcade.Sprite, None] = {}
+        self.coin_sprites: dict[arcade.Sprite, None] = {}
 
-        self.platform_list = arcade.SpriteList()
-        self.enemy_list = arcade.SpriteList()
-        self.coin_list = arcade.SpriteList()
+        # only the parts of the level near the player are simulated and drawn;
+        # platforms never move, so they're drawn from a static layer
+        self.platforms = StaticLayer()
+        self.walls = ActiveRegion(use_spatial_hash=True)
+        self.enemies = ActiveRegion(use_spatial_hash=True)
+        self.coins = ActiveRegion(use_spatial_hash=True)
+        self.moving = MovingEnemies(self.enemies, gravity, level_width)
 
+        # tile platforms are merged into walls per WALL_CHUNK columns; only
+        # the chunks edited since the last compile are merged again
+        self.wall_tiles: dict[int, set[tuple[int, int]]] = {}
+        self.chunk_walls: dict[int, list[arcade.Sprite]] = {}
+        self.dirty_chunks: set[int] = set()
         self.physics_engine = None
+        # with [tile_physics], a TilePhysicsEngine moves the player against
+        # the tiles the walls cover instead of against the wall sprites
+        self.occupancy = TileOccupancy() if tile_physics else None
+        # optional world.ChunkPager paging level chunks in around the player
+        self.pager = None
+        # (left, bottom, right, top) of the world a camera shows, if any;
+        # enemies and coins are kept active around it as well as the player
+        self.camera_view = None
 
         self.left_edge = self.player.width / 2.0
         self.right_edge = level_width - self.player.width / 2.0
 
-        self.camera = arcade.Camera2D()
-        self.camera_bounds = arcade.LRBT(
-            self.window.width / 2.0,
-            self.level_width - self.window.width / 2.0,
-            self.window.height / 2.0,
-            self.window.height / 2.0,
-        )
+        # sprites taken out during play, put back by reset()
+        self.defeated_enemies = []
+        self.collected_coin_sprites = []
 
         self.collected_coins = 0
         self.total_coins = 0
-        self.coins_text = arcade.Text(
-            f"coins collected: {self.collected_coins} / {self.total_coins}",
-            10,
-            window.height - 25,
-            arcade.color.WHITE,
-            FONT_SIZE,
-            align="left",
-        )
-
         self.enemies_defeated = 0
         self.total_enemies = 0
-        self.enemies_text = arcade.Text(
-            f"enemies defeated: {self.enemies_defeated} / {self.total_enemies}",
-            10,
-            window.height - 50,
-            arcade.color.WHITE,
-            FONT_SIZE,
-            align="left",
-        )
+        self.death_count = 0
+        self.ticks = 0
+
+        self.profiler = FrameProfiler()
+        # optional input recorder, see replay.py
+        self.recorder = None
+
+    def compile_platforms(self, left, right) -> None:
+        """Re-merge the tile platforms of edited chunks overlapping [left, right)
+        into collision rectangles.
+
+        Only the player collides with walls, so chunks away from it wait until
+        it gets there. Other platforms are used for collision as they are, from
+        when they're added.
+        """
+        for key in range(int(left // CHUNK_WIDTH), math.ceil(right / CHUNK_WIDTH)):
+            if key not in self.dirty_chunks:
+                continue
+            self.dirty_chunks.discard(key)
+            self.remove_walls(self.chunk_walls.pop(key, []))
+            tiles = self.wall_tiles.get(key)
+            if tiles:
+                self.chunk_walls[key] = make_walls(tiles)
+                self.add_walls(self.chunk_walls[key])
+            else:
+                self.wall_tiles.pop(key, None)
+
+    def split_tiles(self, platforms, count=1) -> list[arcade.Sprite]:
+        """Add (or with [count] -1, take away) the tile platforms among [platforms]
+        with track_tiles().
+
+        Returns the platforms that aren't on the grid, which are their own walls.
+        """
+        tiles = []
+        walls = []
+        for platform in platforms:
+            tile = grid_tile(platform)
+            if tile is None:
+                walls.append(platform)
+            else:
+                tiles.append(tile)
+        self.track_tiles(tiles, count, walls)
+        return walls
+
+    def track_tiles(self, tiles, count=1, platforms=()) -> None:
+        """Add (or with [count] -1, take away) [tiles] (tile_x, tile_y) to their
+        chunks, marking them for compile_platforms(), and to the enemies' grid
+        along with the off-grid [platforms]."""
+        for tile in tiles:
+            key = tile[0] // WALL_CHUNK
+            chunk = self.wall_tiles.setdefault(key, set())
+            if count > 0:
+                chunk.add(tile)
+            else:
+                chunk.discard(tile)
+            self.dirty_chunks.add(key)
+        self.moving.fill(tiles, platforms, count)
+
+    def compact(self) -> None:
+        """Release bookkeeping left by sprites removed from far parts of the level."""
+        for region in (self.walls, self.enemies, self.coins):
+            region.compact()
+
+    def update_regions(self) -> None:
+        reach = self.view_width / 2 + ACTIVE_MARGIN
+        left = self.player.center_x - reach
+        right = self.player.center_x + reach
+        bottom = self.player.center_y - reach
+        top = self.player.center_y + reach
+        # only the player collides with walls; what's drawn must follow the camera
+        self.walls.update(left, right)
+        if self.dirty_chunks:
+            columns, width = self.walls.columns, self.walls.column_width
+            self.compile_platforms(columns.start * width, columns.stop * width)
+        if self.camera_view is not None:
+            view_left, view_bottom, view_right, view_top = self.camera_view
+            left = min(left, view_left - ACTIVE_MARGIN)
+            right = max(right, view_right + ACTIVE_MARGIN)
+            bottom = min(bottom, view_bottom - ACTIVE_MARGIN)
+            top = max(top, view_top + ACTIVE_MARGIN)
+        if self.pager is not None:
+            self.pager.update(left, bottom, right, top)
+        self.enemies.update(left, right)
+        self.coins.update(left, right)
+
+    def setup_physics(self) -> None:
+        """Prepare for play; only re-merges the walls of edited chunks near the player."""
+        self.update_regions()
+        if self.physics_engine is None:
+            if self.tile_physics:
+                self.physics_engine = TilePhysicsEngine(
+                    self.player, self.occupancy, gravity_constant=self.gravity
+                )
+            else:
+                self.physics_engine = arcade.PhysicsEnginePlatformer(
+                    self.player, self.walls.active, gravity_constant=self.gravity
+                )
+            if self.player.jumps > 1:
+                self.physics_engine.enable_multi_jump(self.player.jumps)
 
+    def reset(self) -> None:
+        """Restart play on the same level geometry.
+
+        Only mutable state is touched: the player, counters and whatever was
+        collected or defeated since the last reset.
+        """
+        self.moving.reset()
+        self.add_enemies(self.defeated_enemies)
+        self.add_coins(self.collected_coin_sprites)
+        self.total_enemies -= len(self.defeated_enemies)
+        self.total_coins -= len(self.collected_coin_sprites)
+        self.defeated_enemies = []
+        self.collected_coin_sprites = []
+        self.collected_coins = 0
+        self.enemies_defeated = 0
         self.death_count = 0
-        self.death_text = arcade.Text(
-            f"death count: {self.death_count}",
-            10,
-            window.height - 75,
-            arcade.color.WHITE,
-            FONT_SIZE,
-            align="left",
-        )
+        self.ticks = 0
+        self.recorder = None
+        self.player.reset()
+        if self.physics_engine is not None:
+            self.physics_engine.jumps_since_ground = 0
+        if self.pager is not None:
+            self.pager.reset()
 
-    def on_draw(self) -> None:
-        self.camera.use()
-        self.clear()
-        if self.parallax_scroll:
-            self.bg_stars.draw()
-            self.fg_stars.draw()
-        self.sprites.draw()
-        self.platform_list.draw()
-        self.enemy_list.draw()
-        self.coin_list.draw()
-        self.coins_text.draw()
-        self.enemies_text.draw()
-        self.death_text.draw()
+    def step(self, inputs=(), delta_time=None) -> None:
+        """Advance one tick. [inputs] is an iterable of (symbol, pressed) pairs.
 
-    def on_update(self, delta_time) -> None:
-        self.player.update(delta_time)
-        self.physics_engine.update()
+        [delta_time] defaults to the fixed update rate.
+        """
+        if delta_time is None:
+            delta_time = self.update_rate
+        if self.recorder is not None:
+            self.recorder.record(self.ticks, inputs, delta_time)
+        for symbol, pressed in inputs:
+            if pressed:
+                self.player.on_key_press(symbol, self.physics_engine)
+            else:
+                self.player.on_key_release(symbol, self.physics_engine)
+
+        profiler = self.profiler
+        with profiler.phase("regions"):
+            self.update_regions()
+        with profiler.phase("enemies"):
+            self.moving.update(self.ticks)
+        with profiler.phase("player"):
+            self.player.update(delta_time)
+        with profiler.phase("animation"):
+            self.enemies.update_animation(delta_time)
+            self.coins.update_animation(delta_time)
+        with profiler.phase("physics"):
+            self.physics_engine.update()
+            self.check_ground()
+        with profiler.phase("collisions"):
+            self.check_collisions()
+
+        self.ticks += 1
 
+    def check_ground(self) -> None:
         self.player.center_x = arcade.math.clamp(
             self.player.center_x, self.left_edge, self.right_edge
         )
@@ -289,7 +1120,6 @@ class GameView(arcade.View):
             self.player.change_x = 0
             self.player.change_y = 0
             self.death_count += 1
-            self.death_text.text = f"death count: {self.death_count}"
 
         # check for falling
         if (
@@ -304,7 +1134,7 @@ class GameView(arcade.View):
         if not self.player.on_ground:
             if self.player.state in ("jump", "fall") and self.player.change_y == 0:
                 if (
-                    self.player.time_since_ground >= (1 / self.window._update_rate) / 9
+                    self.player.time_since_ground >= (1 / self.update_rate) / 9
                 ):  # slower transition to walk/idle animations in return for removing infinite jump bug
                     if abs(self.player.change_x) > 0:
                         self.player.set_state("walk")
@@ -315,51 +1145,355 @@ class GameView(arcade.View):
                 else:
                     self.player.time_since_ground += 1
 
-        if self.enemy_list:
-            enemy_hit = arcade.check_for_collision_with_list(
-                self.player, self.enemy_list
+    def check_collisions(self) -> None:
+        if self.enemies.active:
+            enemy_hits = arcade.check_for_collision_with_list(
+                self.player, self.enemies.active
             )
-            if enemy_hit:
+            if enemy_hits:
                 if not self.player.attacking:
                     self.player.position = self.player.start_x, self.player.start_y
                     self.death_count += 1
-                    self.death_text.text = f"death count: {self.death_count}"
                 else:
-                    self.enemy_list.remove(enemy_hit[0])
-                    self.enemies_defeated += 1
-                    self.enemies_text.text = f"enemies defeated: {self.enemies_defeated} / {self.total_enemies}"
-
-        if self.coin_list:
-            coin_hit = arcade.check_for_collision_with_list(self.player, self.coin_list)
-            if coin_hit:
-                self.coin_list.remove(coin_hit[0])
-                self.collected_coins += 1
-                self.coins_text.text = (
-                    f"coins collected: {self.collected_coins} / {self.total_coins}"
+                    # an attack defeats every enemy it touches
+                    self.remove_hits(self.enemies, self.enemy_sprites, enemy_hits)
+                    self.moving.defeat(enemy_hits)
+                    self.defeated_enemies.extend(enemy_hits)
+                    self.enemies_defeated += len(enemy_hits)
+
+        if self.coins.active:
+            coin_hits = arcade.check_for_collision_with_list(
+                self.player, self.coins.active
+            )
+            if coin_hits:
+                self.remove_hits(self.coins, self.coin_sprites, coin_hits)
+                self.collected_coin_sprites.extend(coin_hits)
+                self.collected_coins += len(coin_hits)
+
+    def remove_hits(self, region: ActiveRegion, sprites: dict, hits) -> None:
+        region.remove_many(hits)
+        for sprite in hits:
+            del sprites[sprite]
+
+    def add_platforms(self, platforms, walls=None) -> None:
+        """[walls]: collision walls already made for [platforms] (see make_walls);
+        without them, walls of the edited chunks are recompiled before play."""
+        self.platforms.extend(platforms)
+        if walls is None:
+            walls = self.split_tiles(platforms)
+        self.add_walls(walls)
+
+    def add_platform_tiles(self, tiles, make_sprites) -> None:
+        """Add platforms filling [tiles] (tile_x, tile_y). Their sprites are made
+        by [make_sprites] only when their chunk is first drawn, so a headless
+        simulation never makes them."""
+        self.platforms.defer(tiles, make_sprites)
+        self.track_tiles(tiles)
+
+    def add_walls(self, walls) -> None:
+        self.walls.extend(walls)
+        if self.occupancy is not None:
+            self.occupancy.add(walls)
+
+    def add_enemies(self, enemies, movement=None) -> None:
+        """[movement]: None for static enemies, or PATROL / JUMP."""
+        self.enemy_sprites.update(dict.fromkeys(enemies))
+        self.enemies.extend(enemies)
+        self.total_enemies += len(enemies)
+        if movement is not None:
+            self.moving.add(enemies, movement)
+
+    def add_coins(self, coins) -> None:
+        self.coin_sprites.update(dict.fromkeys(coins))
+        self.coins.extend(coins)
+        self.total_coins += len(coins)
+
+    def remove_platforms(self, platforms, walls=None) -> None:
+        """[walls]: the collision walls made for [platforms], removed with them."""
+        self.platforms.remove_many(platforms)
+        if walls is None:
+            walls = self.split_tiles(platforms, -1)
+        self.remove_walls(walls)
+
+    def remove_walls(self, walls) -> None:
+        self.walls.remove_many(walls)
+        if self.occupancy is not None and walls:
+            self.occupancy.remove(walls)
+            # walls rounded out to tiles can share some; put back the neighbours'
+            columns = {c for wall in walls for c in self.walls.sprite_columns(wall)}
+            self.occupancy.add(
+                {wall for c in columns for wall in self.walls.buckets.get(c, ())}
+            )
+
+    def remove_enemies(self, enemies) -> None:
+        for enemy in enemies:
+            del self.enemy_sprites[enemy]
+        self.enemies.remove_many(enemies)
+        self.moving.remove(enemies)
+        self.total_enemies -= len(enemies)
+
+    def remove_coins(self, coins) -> None:
+        for coin in coins:
+            del self.coin_sprites[coin]
+        self.coins.remove_many(coins)
+        self.total_coins -= len(coins)
+
+    def make_enemy(
+        self,
+        center_x,
+        center_y,
+        scale=0.5,
+        movement=None,
+        speed=ENEMY_SPEED,
+        left=None,
+        right=None,
+    ) -> None:
+        """[movement]: None, PATROL or JUMP; [left]/[right] bound the patrol."""
+        enemy = AnimatedSprite(
+            assets.enemy_animations(), "idle", scale, center_x, center_y
+        )
+        self.add_enemies([enemy])
+        if movement is not None:
+            self.moving.add([enemy], movement, speed, left=left, right=right)
+
+    def make_coin(self, center_x, center_y, scale=0.7) -> None:
+        self.add_coins(
+            [
+                AnimatedSprite(
+                    assets.coin_animations(), "idle", scale, center_x, center_y
+                )
+            ]
+        )
+
+    def make_platform(self, center_x, center_y, width=300, height=40) -> None:
+        self.add_platforms(
+            [
+                arcade.SpriteSolidColor(
+                    width=width,
+                    height=height,
+                    center_x=center_x,
+                    center_y=center_y,
+                    color=arcade.color.YELLOW,
                 )
+            ]
+        )
+
+
+class GameView(arcade.View):
+    def __init__(
+        self,
+        window: arcade.Window,
+        level_width,
+        parallax_scroll,
+        player: Player,
+        gravity,
+        level_height=None,
+        tile_physics=False,
+        star_seed=None,
+    ) -> None:
+        super().__init__()
+        self.window = window
+        self.level_width = level_width
+        # levels taller than the window scroll vertically too
+        self.level_height = window.height if level_height is None else level_height
+        self.parallax_scroll = parallax_scroll
+        self.gravity = gravity
 
-        # save old position for parallax scrolling
-        old_position = self.camera.position
-        self.pan_camera_to_player(CAMERA_PAN_SPEED)
-        self.move_text_with_camera()
+        # recorded with replays so the same stars can be drawn again
+        self.star_seed = random.getrandbits(32) if star_seed is None else star_seed
         if self.parallax_scroll:
-            self.scroll_background(old_position)
+            self.bg_stars = ParallaxLayer(
+                window.width, window.height, speed=0.8, seed=self.star_seed
+            )
+            self.fg_stars = ParallaxLayer(
+                window.width,
+                window.height,
+                speed=0.6,
+                colors=fg_star_color,
+                seed=self.star_seed + 1,
+            )
+
+        self.simulation = Simulation(
+            player, level_width, gravity, UPDATE_RATE, window.width, tile_physics
+        )
+        self.player = player
+        self.sprites = arcade.SpriteList()
+        self.sprites.append(self.player)
+
+        # key events queued until the next simulation step
+        self.inputs = []
+        # simulation time owed to the fixed-rate loop, and the player's
+        # position before the last step, for interpolated rendering
+        self.accumulator = 0.0
+        self.previous_position = player.position
+
+        self.camera = arcade.Camera2D()
+        self.camera_bounds = camera_bounds(
+            self.window, self.level_width, self.level_height
+        )
+
+        self.coins_text = arcade.Text(
+            "",
+            10,
+            window.height - 25,
+            arcade.color.WHITE,
+            FONT_SIZE,
+            align="left",
+        )
+        self.enemies_text = arcade.Text(
+            "",
+            10,
+            window.height - 50,
+            arcade.color.WHITE,
+            FONT_SIZE,
+            align="left",
+        )
+        self.death_text = arcade.Text(
+            "",
+            10,
+            window.height - 75,
+            arcade.color.WHITE,
+            FONT_SIZE,
+            align="left",
+        )
+        self.update_text()
+
+        # shared with the simulation so one frame covers update and draw
+        self.profiler = self.simulation.profiler
+        self.profiler_overlay = ProfilerOverlay(self.profiler)
+
+    @property
+    def physics_engine(self) -> arcade.PhysicsEnginePlatformer | TilePhysicsEngine:
+        return self.simulation.physics_engine
+
+    def reset(self) -> None:
+        """Restart play without rebuilding the level."""
+        self.simulation.reset()
+        self.inputs.clear()
+        self.accumulator = 0.0
+        self.previous_position = self.player.position
+        self.camera.position = self.player.position
+        self.update_camera_view()
+        self.update_text()
+
+    def update_text(self) -> None:
+        sim = self.simulation
+        self.coins_text.text = (
+            f"coins collected: {sim.collected_coins} / {sim.total_coins}"
+        )
+        self.enemies_text.text = (
+            f"enemies defeated: {sim.enemies_defeated} / {sim.total_enemies}"
+        )
+        self.death_text.text = f"death count: {sim.death_count}"
+
+    def on_draw(self) -> None:
+        profiler = self.profiler
+        self.camera.use()
+        self.clear()
+        if self.parallax_scroll:
+            with profiler.phase("draw_stars"):
+                self.bg_stars.draw()
+                self.fg_stars.draw()
+        with profiler.phase("draw_player"):
+            # draw the player between its last two simulated positions
+            position = self.player.position
+            self.player.position = self.render_position()
+            self.sprites.draw()
+            self.player.position = position
+        with profiler.phase("draw_platforms"):
+            left, _, right, _ = self.view_bounds()
+            self.simulation.platforms.draw(left, right)
+        with profiler.phase("draw_enemies"):
+            # moving enemies too are drawn between their last two ticks
+            moved = self.simulation.moving.interpolate(
+                self.simulation.enemies.active, self.render_alpha()
+            )
+            positions = [sprite.position for sprite, _, _ in moved]
+            for sprite, x, y in moved:
+                sprite.position = x, y
+            self.simulation.enemies.active.draw()
+            for (sprite, _, _), position in zip(moved, positions):
+                sprite.position = position
+        with profiler.phase("draw_coins"):
+            self.simulation.coins.active.draw()
+        with profiler.phase("draw_text"):
+            self.coins_text.draw()
+            self.enemies_text.draw()
+            self.death_text.draw()
+        profiler.end_frame()
+        self.profiler_overlay.draw()
+
+    def on_update(self, delta_time) -> None:
+        """Run as many fixed-rate simulation steps as the elapsed time owes."""
+        sim = self.simulation
+        self.accumulator += delta_time
+        steps = 0
+        # the slack keeps float error from skipping a step at matching rates
+        while self.accumulator + 1e-9 >= sim.update_rate:
+            if steps == MAX_STEPS_PER_FRAME:
+                # too far behind to catch up; drop the backlog
+                self.accumulator = 0.0
+                break
+            self.previous_position = self.player.position
+            sim.step(self.inputs)
+            self.inputs.clear()
+            self.accumulator -= sim.update_rate
+            steps += 1
+        if steps:
+            self.update_text()
+
+        with self.profiler.phase("camera"):
+            self.pan_camera_to_player(CAMERA_PAN_SPEED, delta_time)
+            self.move_text_with_camera()
+        with self.profiler.phase("regions"):
+            self.update_camera_view()
+        if self.parallax_scroll:
+            with self.profiler.phase("parallax"):
+                self.scroll_background()
+
+    def view_bounds(self) -> tuple[float, float, float, float]:
+        """The (left, bottom, right, top) of the world the camera shows."""
+        left, bottom = self.camera.bottom_left
+        return left, bottom, left + self.window.width, bottom + self.window.height
+
+    def update_camera_view(self) -> None:
+        """Keep the enemies and coins under the camera active for drawing."""
+        self.simulation.camera_view = self.view_bounds()
+        self.simulation.update_regions()
 
     def move_text_with_camera(self) -> None:
-        self.coins_text.x = self.camera.center_left.x + 10
-        self.enemies_text.x = self.camera.center_left.x + 10
-        self.death_text.x = self.camera.center_left.x + 10
+        left, top = self.camera.top_left
+        for i, text in enumerate((self.coins_text, self.enemies_text, self.death_text)):
+            text.position = left + 10, top - 25 * (i + 1)
+
+    def scroll_background(self) -> None:
+        left, bottom = self.camera.bottom_left
+        self.bg_stars.update(left, bottom)
+        self.fg_stars.update(left, bottom)
+
+    def render_alpha(self) -> float:
+        """How far the time being rendered is into the next tick, from 0 to 1."""
+        return max(self.accumulator / self.simulation.update_rate, 0.0)
 
-    def scroll_background(self, old_position) -> None:
-        position_difference = self.camera.position - old_position
-        self.fg_stars.center_x += position_difference.x * self.fg_star_speed
-        self.bg_stars.center_x += position_difference.x * self.bg_star_speed
+    def render_position(self) -> tuple[float, float]:
+        """The player's position interpolated to the time being rendered."""
+        alpha = self.render_alpha()
+        (x0, y0), (x1, y1) = self.previous_position, self.player.position
+        if abs(x1 - x0) + abs(y1 - y0) > SNAP_DISTANCE:
+            return x1, y1
+        return x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha
 
-    def pan_camera_to_player(self, panning_fraction: float = 1.0) -> None:
+    def pan_camera_to_player(
+        self, panning_fraction: float = 1.0, delta_time=None
+    ) -> None:
+        """Ease the camera toward the rendered player over [delta_time] seconds
+        (default: the window's last frame time)."""
+        if delta_time is None:
+            delta_time = self.window.delta_time
         self.camera.position = arcade.math.smerp_2d(
             self.camera.position,
-            self.player.position,
-            self.window.delta_time,
+            self.render_position(),
+            delta_time,
             panning_fraction,
         )
         self.camera.position = arcade.camera.grips.constrain_xy(
@@ -370,53 +1504,41 @@ class GameView(arcade.View):
         if symbol == arcade.key.ESCAPE:
             if view.maker_view != None:
                 self.window.show_view(view.maker_view)
-        self.player.on_key_press(symbol, self.physics_engine)
+        if symbol == arcade.key.F3:
+            self.profiler_overlay.toggle()
+        if symbol == arcade.key.F4:
+            self.profiler.export_csv(PROFILE_PATH + ".csv")
+            self.profiler.export_json(PROFILE_PATH + ".json")
+        self.inputs.append((symbol, True))
 
     def on_key_release(self, symbol, modifiers) -> None:
-        self.player.on_key_release(symbol, self.physics_engine)
+        self.inputs.append((symbol, False))
 
     def setup_physics(self) -> None:
-        self.physics_engine = arcade.PhysicsEnginePlatformer(
-            self.player, self.platform_list, gravity_constant=self.gravity
-        )
-        if self.player.jumps > 1:
-            self.physics_engine.enable_multi_jump(self.player.jumps)
+        self.simulation.setup_physics()
+        self.previous_position = self.player.position
 
-    def make_enemy(self, center_x, center_y, scale=0.5) -> None:
-        self.enemy_list.append(
-            arcade.Sprite(
-                ":resources:/images/enemies/slimeBlock.png", scale, center_x, center_y
-            )
-        )
-        self.total_enemies += 1
-        self.enemies_text.text = (
-            f"enemies defeated: {self.enemies_defeated} / {self.total_enemies}"
+    def make_enemy(
+        self,
+        center_x,
+        center_y,
+        scale=0.5,
+        movement=None,
+        speed=ENEMY_SPEED,
+        left=None,
+        right=None,
+    ) -> None:
+        self.simulation.make_enemy(
+            center_x, center_y, scale, movement, speed, left, right
         )
+        self.update_text()
 
     def make_coin(self, center_x, center_y, scale=0.7) -> None:
-        self.coin_list.append(
-            arcade.Sprite(
-                ":resources:/images/items/gold_1.png",
-                scale,
-                center_x,
-                center_y,
-            )
-        )
-        self.total_coins += 1
-        self.coins_text.text = (
-            f"coins collected: {self.collected_coins} / {self.total_coins}"
-        )
+        self.simulation.make_coin(center_x, center_y, scale)
+        self.update_text()
 
     def make_platform(self, center_x, center_y, width=300, height=40) -> None:
-        self.platform_list.append(
-            arcade.SpriteSolidColor(
-                width=width,
-                height=height,
-                center_x=center_x,
-                center_y=center_y,
-                color=arcade.color.YELLOW,
-            )
-        )
+        self.simulation.make_platform(center_x, center_y, width, height)
 
     def make_ground(self) -> None:
         self.make_platform(
@@ -424,6 +1546,16 @@ class GameView(arcade.View):
         )
 
 
+def camera_bounds(window: arcade.Window, level_width, level_height) -> arcade.Rect:
+    """Bounds on the camera's center that keep the view inside the level."""
+    return arcade.LRBT(
+        window.width / 2.0,
+        level_width - window.width / 2.0,
+        window.height / 2.0,
+        max(level_height, window.height) - window.height / 2.0,
+    )
+
+
 def make_window(width=800, height=600, title="Sidescroller Engine") -> arcade.Window:
     return arcade.Window(width, height, title)
 
@@ -434,14 +1566,45 @@ def make_game(
     level_width=None,
     parallax_scroll=True,
     gravity=1.0,
+    level_height=None,
+    tile_physics=False,
+    star_seed=None,
 ) -> GameView:
+    """[tile_physics]: move the player with TilePhysicsEngine, for levels built
+    on the TILE_SIZE grid. [star_seed]: seed of the parallax stars, such as a
+    replay's; random by default."""
     if window == None:
         window = make_window()
     if player == None:
         player = make_player()
     if level_width == None:
         level_width = window.width * 2
-    return GameView(window, level_width, parallax_scroll, player, gravity)
+    return GameView(
+        window,
+        level_width,
+        parallax_scroll,
+        player,
+        gravity,
+        level_height,
+        tile_physics,
+        star_seed,
+    )
+
+
+def make_simulation(
+    player: Player = None,
+    level_width=1600,
+    gravity=1.0,
+    update_rate=UPDATE_RATE,
+    view_width=800,
+    tile_physics=False,
+) -> Simulation:
+    """Create a headless simulation; no window is needed to step it."""
+    if player == None:
+        player = make_player()
+    return Simulation(
+        player, level_width, gravity, update_rate, view_width, tile_physics
+    )
 
 
 def run(game: GameView) -> None:
@@ -0,0 +1,113 @@
+"""Replay or simulate a corpus of levels headlessly across every core.
+
+Replay files (.ssmr) are replayed with their recorded inputs. Level files
+(.ssml / .json) are played by a simple bot that runs right and jumps at a
+fixed interval. Per-level metrics are aggregated into one JSON report:
+
+    python farm.py levels/*.ssml traces/*.ssmr --output farm.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import arcade
+import level
+import replay
+from engine import PLAYER_SCALE, TILE_SIZE, Simulation, make_player, make_simulation
+
+BOT_JUMP_INTERVAL = 40  # ticks between the bot's jumps
+
+
+def bot_inputs(tick) -> list[tuple[int, bool]]:
+    if tick == 0:
+        return [(arcade.key.RIGHT, True)]
+    if tick % BOT_JUMP_INTERVAL == 0:
+        return [(arcade.key.UP, True)]
+    return []
+
+
+def metrics(sim: Simulation, elapsed) -> dict:
+    return {
+        "ticks": sim.ticks,
+        "ticks_per_second": sim.ticks / elapsed if elapsed else 0.0,
+        "deaths": sim.death_count,
+        "coins": sim.collected_coins,
+        "total_coins": sim.total_coins,
+        "enemies_defeated": sim.enemies_defeated,
+        "total_enemies": sim.total_enemies,
+        # reached the last tile column of the level
+        "completed": sim.player.center_x >= sim.level_width - TILE_SIZE,
+    }
+
+
+def run_trace(path) -> dict:
+    trace = replay.load(path)
+    sim = replay.make_replay_simulation(trace)
+    start = time.perf_counter()
+    replay.replay(trace, sim)
+    return metrics(sim, time.perf_counter() - start)
+
+
+def run_level(path, ticks) -> dict:
+    play_level = level.load(path)
+    sim = make_simulation(make_player(PLAYER_SCALE), play_level.level_width)
+    level.build(play_level, sim)
+    sim.setup_physics()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        sim.step(bot_inputs(tick))
+    return metrics(sim, time.perf_counter() - start)
+
+
+def run_one(path, ticks) -> dict:
+    try:
+        if path.endswith(".ssmr"):
+            result = {"mode": "replay", **run_trace(path)}
+        else:
+            result = {"mode": "bot", **run_level(path, ticks)}
+    except Exception as error:  # report broken files instead of stopping the farm
+        result = {"error": f"{type(error).__name__}: {error}"}
+    return {"path": path, **result}
+
+
+def summarize(results) -> dict:
+    ok = [result for result in results if "error" not in result]
+    return {
+        "levels": len(results),
+        "errors": len(results) - len(ok),
+        "completed": sum(result["completed"] for result in ok),
+        "deaths": sum(result["deaths"] for result in ok),
+        "coins": sum(result["coins"] for result in ok),
+        "ticks": sum(result["ticks"] for result in ok),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="level/replay files or globs")
+    parser.add_argument(
+        "--ticks", type=int, default=3600, help="bot ticks per level file"
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="farm.json")
+    args = parser.parse_args(argv)
+
+    paths = sorted({match for path in args.paths for match in glob.glob(path)})
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers) as pool:
+        results = list(pool.map(run_one, paths, [args.ticks] * len(paths)))
+    summary = summarize(results)
+    summary["wall_time"] = time.perf_counter() - start
+
+    with open(args.output, "w") as file:
+        json.dump({"summary": summary, "results": results}, file, indent=2)
+    print(json.dumps(summary))
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""Level files for the maker and engine.
+
+Two forms are supported, picked by file extension:
+- ".json": readable, one list of tile coordinates per kind
+- anything else: compact binary, a header followed by packed (kind, tile_x, tile_y) records
+"""
+
+import functools
+import json
+import struct
+import arcade
+import assets
+from animation import AnimatedSprite
+from engine import (
+    TILE_SIZE,
+    ENEMY_SCALE,
+    COIN_SCALE,
+    JUMP,
+    PATROL,
+    Simulation,
+)
+
+VERSION = 1
+MAGIC = b"SSML"
+HEADER = struct.Struct("<4sHII")  # magic, version, level width, record count
+RECORD = struct.Struct("<Bii")  # kind, tile x, tile y
+
+PLAYER = 0
+PLATFORM = 1
+ENEMY = 2
+COIN = 3
+PATROLLER = 4
+JUMPER = 5
+KINDS = (PLATFORM, ENEMY, COIN, PATROLLER, JUMPER)
+KIND_NAMES = {
+    PLATFORM: "platforms",
+    ENEMY: "enemies",
+    COIN: "coins",
+    PATROLLER: "patrollers",
+    JUMPER: "jumpers",
+}
+MOVEMENTS = {PATROLLER: PATROL, JUMPER: JUMP}
+# moving enemies are tinted so they stand out from static ones in the maker
+TINTS = {PATROLLER: (170, 200, 255), JUMPER: (170, 255, 170)}
+
+
+def to_tile(center_x, center_y) -> tuple[int, int]:
+    return int(center_x // TILE_SIZE), int(center_y // TILE_SIZE)
+
+
+def tile_center(tile_x, tile_y) -> tuple[float, float]:
+    return tile_x * TILE_SIZE + TILE_SIZE / 2, tile_y * TILE_SIZE + TILE_SIZE / 2
+
+
+def player_tile(center_x, center_y) -> tuple[int, int]:
+    """The player is two tiles high; its tile is the lower one."""
+    return int(center_x // TILE_SIZE), int(center_y // TILE_SIZE) - 1
+
+
+def player_center(tile_x, tile_y) -> tuple[float, float]:
+    return tile_x * TILE_SIZE + TILE_SIZE / 2, (tile_y + 1) * TILE_SIZE
+
+
+class Level:
+    def __init__(
+        self,
+        level_width,
+        player=(2, 4),
+        platforms=None,
+        enemies=None,
+        coins=None,
+        patrollers=None,
+        jumpers=None,
+    ):
+        self.level_width = level_width
+        self.player = tuple(player)
+        self.platforms = platforms if platforms is not None else []
+        self.enemies = enemies if enemies is not None else []
+        self.coins = coins if coins is not None else []
+        self.patrollers = patrollers if patrollers is not None else []
+        self.jumpers = jumpers if jumpers is not None else []
+
+    def tiles(self, kind) -> list[tuple[int, int]]:
+        if kind == PLATFORM:
+            return self.platforms
+        if kind == ENEMY:
+            return self.enemies
+        if kind == COIN:
+            return self.coins
+        if kind == PATROLLER:
+            return self.patrollers
+        if kind == JUMPER:
+            return self.jumpers
+        return [self.player]
+
+    def all_enemies(self) -> list[tuple[int, int]]:
+        """Spawn tiles of static and moving enemies."""
+        return self.enemies + self.patrollers + self.jumpers
+
+    def records(self):
+        yield (PLAYER, *self.player)
+        for kind in KINDS:
+            for tile_x, tile_y in self.tiles(kind):
+                yield kind, tile_x, tile_y
+
+    def __len__(self) -> int:
+        return 1 + sum(len(self.tiles(kind)) for kind in KINDS)
+
+
+def from_simulation(sim: Simulation) -> Level:
+    """Snapshot the tile positions of a maker-built simulation."""
+    level = Level(
+        sim.level_width,
+        player_tile(sim.player.start_x, sim.player.start_y),
+        [to_tile(*platform.position) for platform in sim.platforms],
+        coins=[to_tile(*coin.position) for coin in sim.coin_sprites],
+    )
+    kinds = {None: ENEMY, PATROL: PATROLLER, JUMP: JUMPER}
+    for enemy in sim.enemy_sprites:
+        kind = kinds[sim.moving.movement(enemy)]
+        level.tiles(kind).append(to_tile(*enemy.position))
+    return level
+
+
+def to_json(level: Level) -> dict:
+    data = {"version": VERSION, "level_width": level.level_width}
+    data["player"] = list(level.player)
+    for kind, name in KIND_NAMES.items():
+        data[name] = [list(tile) for tile in level.tiles(kind)]
+    return data
+
+
+def from_json(data: dict) -> Level:
+    if data.get("version") != VERSION:
+        raise ValueError(f"unsupported level version: {data.get('version')}")
+    return Level(
+        data["level_width"],
+        data["player"],
+        *([tuple(tile) for tile in data.get(name, [])] for name in KIND_NAMES.values()),
+    )
+
+
+def to_bytes(level: Level) -> bytes:
+    records = b"".join(RECORD.pack(*record) for record in level.records())
+    return HEADER.pack(MAGIC, VERSION, level.level_width, len(level)) + records
+
+
+def from_bytes(data: bytes) -> Level:
+    magic, version, level_width, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a level file")
+    if version != VERSION:
+        raise ValueError(f"unsupported level version: {version}")
+    end = HEADER.size + count * RECORD.size
+    if len(data) < end:
+        raise ValueError("truncated level file")
+    level = Level(level_width)
+    by_kind = {kind: level.tiles(kind) for kind in KINDS}
+    for kind, tile_x, tile_y in RECORD.iter_unpack(data[HEADER.size : end]):
+        if kind == PLAYER:
+            level.player = tile_x, tile_y
+        else:
+            by_kind[kind].append((tile_x, tile_y))
+    return level
+
+
+def save(level: Level, path) -> None:
+    if str(path).endswith(".json"):
+        with open(path, "w") as file:
+            json.dump(to_json(level), file)
+    else:
+        with open(path, "wb") as file:
+            file.write(to_bytes(level))
+
+
+def load(path) -> Level:
+    if str(path).endswith(".json"):
+        with open(path) as file:
+            return from_json(json.load(file))
+    with open(path, "rb") as file:
+        return from_bytes(file.read())
+
+
+def make_sprites(level: Level, kind) -> list[arcade.Sprite]:
+    return make_tile_sprites(kind, level.tiles(kind))
+
+
+def make_tile_sprites(kind, tiles) -> list[arcade.Sprite]:
+    """Build the sprites for one kind of tile, sharing a single texture."""
+    if kind == PLATFORM:
+        return [
+            arcade.SpriteSolidColor(
+                TILE_SIZE, TILE_SIZE, *tile_center(*tile), color=arcade.color.YELLOW
+            )
+            for tile in tiles
+        ]
+    if kind == COIN:
+        animations, scale = assets.coin_animations(), COIN_SCALE
+    else:
+        animations, scale = assets.enemy_animations(), ENEMY_SCALE
+    sprites = [
+        AnimatedSprite(animations, "idle", scale, *tile_center(*tile)) for tile in tiles
+    ]
+    if kind in TINTS:
+        for sprite in sprites:
+            sprite.color = TINTS[kind]
+    return sprites
+
+
+def add_sprites(sim: Simulation, kind, sprites) -> None:
+    if kind == PLATFORM:
+        sim.add_platforms(sprites)
+    elif kind == ENEMY:
+        sim.add_enemies(sprites)
+    elif kind == COIN:
+        sim.add_coins(sprites)
+    elif kind in MOVEMENTS:
+        sim.add_enemies(sprites, MOVEMENTS[kind])
+
+
+def remove_sprites(sim: Simulation, kind, sprites) -> None:
+    if kind == PLATFORM:
+        sim.remove_platforms(sprites)
+    elif kind in (ENEMY, PATROLLER, JUMPER):
+        sim.remove_enemies(sprites)
+    elif kind == COIN:
+        sim.remove_coins(sprites)
+
+
+def build(level: Level, sim: Simulation) -> None:
+    """Fill an empty simulation with the level's sprites, one bulk extend per list.
+
+    Platform sprites are only made for the chunks that get drawn.
+    """
+    sim.player.start_x, sim.player.start_y = player_center(*level.player)
+    sim.player.position = sim.player.start_x, sim.player.start_y
+    for kind in KINDS:
+        if kind == PLATFORM:
+            sim.add_platform_tiles(
+                level.tiles(kind), functools.partial(make_tile_sprites, kind)
+            )
+        else:
+            add_sprites(sim, kind, make_sprites(level, kind))
@@ -2,43 +2,100 @@
 # - clean up format
 # - update README.md
 
+import time
+
+LAUNCH_TIME = time.perf_counter()  # before the heavy imports, for --startup
+
+import argparse
+import functools
+from concurrent.futures import Future, ProcessPoolExecutor
 import arcade
+import assets
+import level
+import reachability
+import replay
 import view
+import world
 from engine import *
+from profiler import StartupTimer
 
-window = make_window(title="Sidescroller Maker")
+# created on first use, so importing main doesn't open a window
+window = None
 
-TILE_SIZE = 40
-COIN_SCALE = TILE_SIZE / 64 - 0.05  # slightly smaller than tile
-ENEMY_SCALE = TILE_SIZE / 128
-PLAYER_SCALE = 80 / 92  # two tile height
 X_SCALE = 0.7  # slightly smaller than tile
+LEVEL_PATH = "level.ssml"
+REPLAY_PATH = "replay.ssmr"
+BUILD_KINDS = {
+    "platform": level.PLATFORM,
+    "enemy": level.ENEMY,
+    "coin": level.COIN,
+    "patroller": level.PATROLLER,
+    "jumper": level.JUMPER,
+}
+
+
+PLAYER_START = level.player_center(2, 4)  # make_player's default start
+
+
+def get_window() -> arcade.Window:
+    global window
+    if window is None:
+        window = make_window(title="Sidescroller Maker")
+    return window
+
+
+@functools.cache
+def reachability_pool() -> ProcessPoolExecutor:
+    """One worker for live reachability checks, so a slow one never blocks a frame."""
+    return ProcessPoolExecutor(1)
+
+
+@functools.cache
+def platform_texture() -> arcade.Texture:
+    return arcade.make_soft_square_texture(
+        size=TILE_SIZE,
+        color=arcade.color.YELLOW,
+        center_alpha=255,
+        outer_alpha=255,
+    )
 
 
 class Builder(arcade.Sprite):
-    def __init__(
-        self,
-        textures: list[arcade.Texture],
-    ):
-        super().__init__(textures[0], PLAYER_SCALE)
-        self.textures = textures
+    """Build cursor. Each build's texture is fetched when it is first selected."""
+
+    def __init__(self, texture_getters):
+        super().__init__(texture_getters[0](), PLAYER_SCALE)
+        self.texture_getters = texture_getters
+
+    def set_texture(self, texture_no: int) -> None:
+        self.texture = self.texture_getters[texture_no]()
 
 
 class MakerView(arcade.View):
     def __init__(self) -> None:
         super().__init__()
-        self.game = make_game(window, make_player(PLAYER_SCALE))
+        # the game is built on first use (an edit or play), not at startup
+        self._game = None
+        self.level_width = self.window.width * 2
+        self.level_height = self.window.height
+        # an open chunked world and the pager keeping its chunks near the
+        # camera resident; edits are written straight to the world file
+        self.world = None
+        self.pager = None
 
-        self.sprites = arcade.SpriteList()
+        # placed tiles stay put while editing, so they're drawn from a static layer
+        self.sprites = StaticLayer()
+        # placed tiles keyed by (tile_x, tile_y) -> (kind, sprite in self.sprites)
+        self.tiles = {}
         self.player = arcade.SpriteList()
         self.builder_draw = arcade.SpriteList()
 
         self.player.append(
             arcade.Sprite(
-                arcade.load_texture("assets/images/p1_stand.png"),
+                assets.get_texture("player_idle"),
                 scale=PLAYER_SCALE,
-                center_x=self.game.player.start_x,
-                center_y=self.game.player.start_y,
+                center_x=PLAYER_START[0],
+                center_y=PLAYER_START[1],
             )
         )
 
@@ -48,119 +105,361 @@ class MakerView(arcade.View):
             2: "enemy",
             3: "coin",
             4: "x",
+            5: "patroller",
+            6: "jumper",
         }
-        textures = [
-            arcade.load_texture("assets/images/p1_stand.png"),
-            arcade.make_soft_square_texture(
-                size=TILE_SIZE,
-                color=arcade.color.YELLOW,
-                center_alpha=255,
-                outer_alpha=255,
-            ),
-            arcade.load_texture(":resources:/images/enemies/slimeBlock.png"),
-            arcade.load_texture(":resources:/images/items/gold_1.png"),
-            arcade.load_texture("assets/images/red_x.png"),
+        texture_getters = [
+            functools.partial(assets.get_texture, "player_idle"),
+            platform_texture,
+            functools.partial(assets.get_texture, "enemy"),
+            functools.partial(assets.get_texture, "coin"),
+            functools.partial(assets.get_texture, "red_x"),
+            functools.partial(assets.get_texture, "enemy"),
+            functools.partial(assets.get_texture, "enemy"),
         ]
-        self.builder = Builder(textures)
+        self.builder = Builder(texture_getters)
         self.builder.position = TILE_SIZE / 2, TILE_SIZE
         self.builder_draw.append(self.builder)
 
-        self.grid = arcade.shape_list.ShapeElementList()
-        for i in range(20, self.game.level_width, TILE_SIZE):
-            for j in range(20, window.height, TILE_SIZE):
-                square = arcade.shape_list.create_rectangle_outline(
-                    center_x=i,
-                    center_y=j,
-                    width=TILE_SIZE,
-                    height=TILE_SIZE,
-                    color=(255, 255, 255, 100),
-                )
-                self.grid.append(square)
+        # built on the first draw
+        self._grid = None
 
         self.camera = arcade.Camera2D()
-        self.camera_bounds = arcade.LRBT(
-            self.window.width / 2.0,
-            self.game.level_width - self.window.width / 2.0,
-            self.window.height / 2.0,
-            self.window.height / 2.0,
+        self.camera_bounds = camera_bounds(
+            self.window, self.level_width, self.level_height
         )
 
+        self.profiler = FrameProfiler()
+        self.profiler_overlay = ProfilerOverlay(self.profiler)
+
+        # set by main(); reports the startup breakdown after the first frame
+        self.startup = None
+
+        # first corner of a rectangle fill/erase (B key or mouse drag)
+        self.anchor = None
+
+        # A toggles live reachability checks; problems are marked in red
+        self.check_reachability = False
+        self.reachability_dirty = False
+        self.reachability_markers = arcade.SpriteList()
+        # the analysis running in reachability_pool(), if any
+        self.reachability_job: Future | None = None
+
+        # R toggles recording the inputs of each play session to REPLAY_PATH
+        self.recording = False
+        self.trace = None
+
+        # set by main(); play with TilePhysicsEngine, as everything is on the grid
+        self.tile_physics = False
+
+    @property
+    def game(self) -> GameView:
+        """The game sharing the maker's sprites, built when first needed."""
+        if self._game is None:
+            self._game = make_game(
+                self.window,
+                make_player(PLAYER_SCALE),
+                level_width=self.level_width,
+                level_height=self.level_height,
+                tile_physics=self.tile_physics,
+            )
+            player = self._game.player
+            player.start_x, player.start_y = self.player[0].position
+            player.position = self.player[0].position
+        return self._game
+
+    @property
+    def grid(self) -> arcade.shape_list.ShapeElementList:
+        """One screen of grid lines (plus a spare row and column), shifted with
+        the camera."""
+        if self._grid is None:
+            self._grid = arcade.shape_list.ShapeElementList()
+            grid_width = self.window.width + TILE_SIZE
+            grid_height = self.window.height + TILE_SIZE
+            points = []
+            for x in range(0, grid_width + 1, TILE_SIZE):
+                points += [(x, 0), (x, grid_height)]
+            for y in range(0, grid_height + 1, TILE_SIZE):
+                points += [(0, y), (grid_width, y)]
+            self._grid.append(
+                arcade.shape_list.create_lines(points, color=(255, 255, 255, 100))
+            )
+        return self._grid
+
+    def on_show_view(self) -> None:
+        # back from a recorded play session
+        if self.trace is not None:
+            replay.save(self.trace, REPLAY_PATH)
+            self.trace = None
+        # the game shares the maker's sprites; put moved enemies back
+        if self._game is not None:
+            self._game.reset()
+
     def on_draw(self) -> None:
+        profiler = self.profiler
         self.camera.use()
         self.clear()
-        self.grid.draw()
-        self.sprites.draw()
-        self.player.draw()
-        self.builder_draw.draw()
+        with profiler.phase("draw_grid"):
+            self.grid.draw()
+        with profiler.phase("draw_tiles"):
+            left = self.camera.bottom_left.x
+            self.sprites.draw(left, left + self.window.width)
+            self.reachability_markers.draw()
+        with profiler.phase("draw_player"):
+            self.player.draw()
+            self.builder_draw.draw()
+        profiler.end_frame()
+        self.profiler_overlay.draw()
+        if self.startup is not None:
+            self.startup.mark("first_frame")
+            print(self.startup.summary())
+            print(f"  textures loaded: {assets.stats()['loaded']}")
+            self.startup = None
 
     def on_update(self, delta_time) -> None:
         self.camera.position = self.builder.position
         self.camera.position = arcade.camera.grips.constrain_xy(
             self.camera.view_data, self.camera_bounds
         )
+        left, bottom = self.camera.bottom_left
+        if self.pager is not None:
+            with self.profiler.phase("paging"):
+                loads = self.pager.loads
+                self.pager.update(
+                    left, bottom, left + self.window.width, bottom + self.window.height
+                )
+                # reachability is checked over the resident chunks
+                if self.pager.loads != loads:
+                    self.reachability_dirty = True
+        # snap the grid to the tile at the camera's bottom left corner
+        self.grid.position = (
+            left // TILE_SIZE * TILE_SIZE,
+            bottom // TILE_SIZE * TILE_SIZE,
+        )
+        if self.check_reachability:
+            with self.profiler.phase("reachability"):
+                self.update_reachability()
+
+    def player_footprint(self) -> tuple[tuple[int, int], tuple[int, int]]:
+        """The two cells covered by the player."""
+        tile_x, tile_y = level.player_tile(*self.player[0].position)
+        return (tile_x, tile_y), (tile_x, tile_y + 1)
+
+    def remove_tiles(self, tiles) -> None:
+        """Remove every placed tile in [tiles] with one batched update per list."""
+        self.reachability_dirty = True
+        if self.pager is not None:
+            self.pager.remove(tiles)
+            return
+        removed = {}
+        for tile in tiles:
+            if tile in self.tiles:
+                kind, sprite = self.tiles.pop(tile)
+                removed.setdefault(kind, []).append(sprite)
+        if removed:
+            self.sprites.remove_many(
+                [sprite for kind in removed for sprite in removed[kind]]
+            )
+        for kind, sprites in removed.items():
+            level.remove_sprites(self.game.simulation, kind, sprites)
+
+    def place_tiles(self, kind, tiles) -> None:
+        """Place [kind] on every tile in [tiles], replacing what was there."""
+        tiles = list(tiles)
+        self.remove_tiles(tiles)
+        # tiles can't overlap the player
+        footprint = self.player_footprint()
+        tiles = [tile for tile in tiles if tile not in footprint]
+        self.reachability_dirty = True
+        if self.pager is not None:
+            self.pager.place(kind, tiles)
+            return
+        sprites = level.make_tile_sprites(kind, tiles)
+        for tile, sprite in zip(tiles, sprites):
+            self.tiles[tile] = kind, sprite
+        self.sprites.extend(sprites)
+        # the game shares the maker's sprites, so play needs no rebuild
+        level.add_sprites(self.game.simulation, kind, sprites)
+
+    def rect_tiles(self, corner, other_corner) -> list[tuple[int, int]]:
+        """Every tile in the rectangle between two corners, clipped to the level."""
+        columns = int(self.level_width // TILE_SIZE)
+        rows = int(self.level_height // TILE_SIZE)
+        left, right = sorted((corner[0], other_corner[0]))
+        bottom, top = sorted((corner[1], other_corner[1]))
+        return [
+            (tile_x, tile_y)
+            for tile_x in range(max(left, 0), min(right, columns - 1) + 1)
+            for tile_y in range(max(bottom, 0), min(top, rows - 1) + 1)
+        ]
+
+    def apply_build(self, tiles) -> None:
+        """Fill [tiles] with the current build, or erase them with the delete tool."""
+        build = self.textures_indices[self.builder.cur_texture_index]
+        if build == "x":
+            self.remove_tiles(tiles)
+        elif build in BUILD_KINDS:
+            self.place_tiles(BUILD_KINDS[build], tiles)
+
+    def update_reachability(self) -> None:
+        """Mark the last finished analysis's problems and start the next one.
+
+        One analysis runs at a time, in reachability_pool(); edits made while it
+        runs are checked together by the one after it.
+        """
+        job = self.reachability_job
+        if job is not None:
+            if not job.done():
+                return
+            self.reachability_job = None
+            self.mark_problems(job.result())
+        if self.reachability_dirty and self.world is not None:
+            start = level.player_tile(*self.player[0].position)
+            if self.world.chunk_of(*start) not in self.pager.resident:
+                # nothing is reachable without the start's chunk
+                self.reachability_markers.clear()
+                self.reachability_dirty = False
+        if self.reachability_dirty:
+            player = self.game.player
+            self.reachability_job = reachability_pool().submit(
+                reachability.analyze,
+                self.to_level(),
+                player.jumps,
+                player.jump_speed,
+                player.movement_speed,
+                self.game.gravity,
+                self.level_height // TILE_SIZE,
+            )
+            self.reachability_dirty = False
+
+    def mark_problems(self, report: reachability.Report) -> None:
+        """Mark unreachable coins and enemies and soft-lock cells in red."""
+        self.reachability_markers.clear()
+        problems = (
+            report.unreachable_coins + report.unreachable_enemies + report.soft_locks
+        )
+        self.reachability_markers.extend(
+            arcade.SpriteSolidColor(
+                TILE_SIZE, TILE_SIZE, *level.tile_center(*tile), (255, 0, 0, 100)
+            )
+            for tile in problems
+        )
+
+    def to_level(self) -> level.Level:
+        """The placed tiles as a level; for a world, only the resident chunks'."""
+        player = level.player_tile(*self.player[0].position)
+        new_level = level.Level(self.level_width, player)
+        for tile, (kind, sprite) in self.tiles.items():
+            new_level.tiles(kind).append(tile)
+        return new_level
 
-    def resolve_game_collisions(self, sprite) -> None:
-        ground_overlap = arcade.check_for_collision_with_list(
-            sprite, self.game.platform_list
+    def load_level(self, new_level: level.Level) -> None:
+        self.level_width = new_level.level_width
+        self.level_height = self.window.height
+        self.player[0].position = level.player_center(*new_level.player)
+        self._game = None  # rebuilt for the new level width and start
+        self.world = self.pager = None
+
+        self.sprites.clear()
+        self.tiles = {}
+        for kind in level.KINDS:
+            sprites = level.make_sprites(new_level, kind)
+            for tile, sprite in zip(new_level.tiles(kind), sprites):
+                self.tiles[tile] = kind, sprite
+            self.sprites.extend(sprites)
+            level.add_sprites(self.game.simulation, kind, sprites)
+        self.game.update_text()
+        self.reachability_dirty = True
+        self.reachability_job = None  # it was checking the old level
+        self.camera_bounds = camera_bounds(
+            self.window, self.level_width, self.level_height
         )
-        if ground_overlap:
-            self.game.platform_list.remove(ground_overlap[0])
 
-        enemy_overlap = arcade.check_for_collision_with_list(
-            sprite, self.game.enemy_list
+    def open_world(self, new_world: world.World) -> None:
+        """Edit a chunked world; only the chunks near the camera are kept as sprites."""
+        self.level_width = new_world.level_width
+        self.level_height = new_world.level_height
+        self.player[0].position = level.player_center(*new_world.player)
+        self._game = None
+        self.world = new_world
+        self.pager = world.build(new_world, self.game.simulation)
+        # the pager's index and sprites stand in for the maker's own
+        self.tiles = self.pager.tiles
+        self.sprites = self.pager.sprites
+        self.game.update_text()
+        self.reachability_dirty = True
+        self.reachability_job = None
+        self.camera_bounds = camera_bounds(
+            self.window, self.level_width, self.level_height
         )
-        if enemy_overlap:
-            self.game.enemy_list.remove(enemy_overlap[0])
-
-        coin_overlap = arcade.check_for_collision_with_list(sprite, self.game.coin_list)
-        if coin_overlap:
-            self.game.coin_list.remove(coin_overlap[0])
-
-    def resolve_player_collision(self) -> None:
-        if self.player:
-            overlap = arcade.check_for_collision_with_list(self.player[0], self.sprites)
-            if overlap:
-                for i in range(len(overlap)):
-                    self.sprites.remove(overlap[i])
-                    self.resolve_game_collisions(self.game.player)
-
-    def resolve_maker_collisions(self, sprite) -> None:
-        overlap = arcade.check_for_collision_with_list(sprite, self.sprites)
-        if overlap:
-            self.sprites.remove(overlap[0])
-            self.resolve_game_collisions(sprite)
+
+    def play(self) -> GameView:
+        """Restart the game on the shared level; only mutable state is reset."""
+        self.game.reset()
+        # a world's moving enemies only move in resident chunks, so its play
+        # can't be replayed on the whole level; worlds aren't recorded
+        if self.recording and self.world is None:
+            self.trace = replay.start_recording(
+                self.game.simulation, self.game.star_seed, self.to_level()
+            )
+        return self.game
+
+    def on_mouse_press(self, x, y, button, modifiers) -> None:
+        world = self.camera.unproject((x, y))
+        self.anchor = level.to_tile(world.x, world.y)
+
+    def on_mouse_release(self, x, y, button, modifiers) -> None:
+        if self.anchor is None:
+            return
+        world = self.camera.unproject((x, y))
+        tiles = self.rect_tiles(self.anchor, level.to_tile(world.x, world.y))
+        with self.profiler.phase("fill"):
+            if button == arcade.MOUSE_BUTTON_RIGHT:
+                self.remove_tiles(tiles)
+            else:
+                self.apply_build(tiles)
+        self.anchor = None
 
     def on_key_press(self, symbol, modifiers) -> None:
+        with self.profiler.phase("key_press"):
+            self.handle_key_press(symbol)
+
+    def handle_key_press(self, symbol) -> None:
+        # profiling
+        if symbol == arcade.key.F3:
+            self.profiler_overlay.toggle()
+        if symbol == arcade.key.F4:
+            self.profiler.export_csv(PROFILE_PATH + ".csv")
+            self.profiler.export_json(PROFILE_PATH + ".json")
+
         # start game
         if symbol == arcade.key.ENTER:
-            # clone the game to keep original state safe
-            game = make_game(
-                window,
-                make_player(
-                    scale=PLAYER_SCALE,
-                    start_x=self.game.player.start_x,
-                    start_y=self.game.player.start_y,
-                ),
-            )
-            for platform in self.game.platform_list:
-                game.make_platform(
-                    center_x=platform.center_x,
-                    center_y=platform.center_y,
-                    width=TILE_SIZE,
-                    height=TILE_SIZE,
-                )
-            for enemy in self.game.enemy_list:
-                game.make_enemy(
-                    center_x=enemy.center_x, center_y=enemy.center_y, scale=ENEMY_SCALE
-                )
-            for coin in self.game.coin_list:
-                game.make_coin(
-                    center_x=coin.center_x, center_y=coin.center_y, scale=COIN_SCALE
-                )
-            run(game)
+            run(self.play())
+
+        if symbol == arcade.key.R:
+            self.recording = not self.recording
+
+        if symbol == arcade.key.A:
+            self.check_reachability = not self.check_reachability
+            self.reachability_dirty = True
+            self.reachability_job = None
+            self.reachability_markers.clear()
+
+        # save / load level
+        if symbol == arcade.key.S:
+            with self.profiler.phase("save_level"):
+                if self.world is not None:
+                    self.world.player = level.player_tile(*self.player[0].position)
+                    self.world.flush()
+                else:
+                    level.save(self.to_level(), LEVEL_PATH)
+        if symbol == arcade.key.L:
+            with self.profiler.phase("load_level"):
+                self.load_level(level.load(LEVEL_PATH))
 
         # place build
         if symbol == arcade.key.SPACE:
+            tile = level.to_tile(*self.builder.position)
             if self.textures_indices[self.builder.cur_texture_index] == "player":
                 self.game.player.position = self.builder.center_x, self.builder.center_y
                 self.game.player.start_x = self.builder.center_x
@@ -168,66 +467,28 @@ class MakerView(arcade.View):
                 self.player.remove(self.player[0])
                 self.player.append(
                     arcade.Sprite(
-                        arcade.load_texture("assets/images/p1_stand.png"),
+                        assets.get_texture("player_idle"),
                         scale=PLAYER_SCALE,
                         center_x=self.builder.center_x,
                         center_y=self.builder.center_y,
                     )
                 )
-                self.resolve_player_collision()
-            elif self.textures_indices[self.builder.cur_texture_index] == "platform":
-                platform = arcade.SpriteSolidColor(
-                    width=TILE_SIZE,
-                    height=TILE_SIZE,
-                    center_x=self.builder.center_x,
-                    center_y=self.builder.center_y,
-                    color=arcade.color.YELLOW,
-                )
-                self.resolve_maker_collisions(platform)
-                self.sprites.append(platform)
-                self.resolve_player_collision()
-                self.game.make_platform(
-                    self.builder.center_x, self.builder.center_y, TILE_SIZE, TILE_SIZE
-                )
-            elif self.textures_indices[self.builder.cur_texture_index] == "enemy":
-                enemy = arcade.Sprite(
-                    arcade.load_texture(":resources:/images/enemies/slimeBlock.png"),
-                    scale=ENEMY_SCALE,
-                    center_x=self.builder.center_x,
-                    center_y=self.builder.center_y,
-                )
-                self.resolve_maker_collisions(enemy)
-                self.sprites.append(enemy)
-                self.resolve_player_collision()
-                self.game.make_enemy(
-                    self.builder.center_x, self.builder.center_y, ENEMY_SCALE
-                )
-            elif self.textures_indices[self.builder.cur_texture_index] == "coin":
-                coin = arcade.Sprite(
-                    arcade.load_texture(":resources:/images/items/gold_1.png"),
-                    scale=COIN_SCALE,
-                    center_x=self.builder.center_x,
-                    center_y=self.builder.center_y,
-                )
-                self.resolve_maker_collisions(coin)
-                self.sprites.append(coin)
-                self.resolve_player_collision()
-                self.game.make_coin(
-                    self.builder.center_x, self.builder.center_y, COIN_SCALE
-                )
-            elif self.textures_indices[self.builder.cur_texture_index] == "x":
-                delete = arcade.Sprite(
-                    arcade.load_texture("assets/images/red_x.png"),
-                    center_x=self.builder.center_x,
-                    center_y=self.builder.center_y,
-                )
-                self.resolve_maker_collisions(delete)
+                self.remove_tiles(self.player_footprint())
+            elif self.anchor is not None:
+                self.apply_build(self.rect_tiles(self.anchor, tile))
+            else:
+                self.apply_build([tile])
+            self.anchor = None
+
+        # anchor a rectangle fill/erase at the cursor; SPACE applies it
+        if symbol == arcade.key.B:
+            self.anchor = level.to_tile(*self.builder.position)
 
         # change builder build
         if symbol == arcade.key.KEY_1:
             if self.builder.cur_texture_index != 0:
                 self.builder.center_y += TILE_SIZE / 2
-                if self.builder.center_y == window.height:
+                if self.builder.center_y == self.level_height:
                     self.builder.center_y -= TILE_SIZE
             self.builder.cur_texture_index = 0
             self.builder.set_texture(self.builder.cur_texture_index)
@@ -251,16 +512,26 @@ class MakerView(arcade.View):
                 self.builder.center_y -= TILE_SIZE / 2
             self.builder.cur_texture_index = 4
             self.builder.set_texture(self.builder.cur_texture_index)
+        elif symbol == arcade.key.KEY_6:
+            if self.builder.cur_texture_index == 0:
+                self.builder.center_y -= TILE_SIZE / 2
+            self.builder.cur_texture_index = 5
+            self.builder.set_texture(self.builder.cur_texture_index)
+        elif symbol == arcade.key.KEY_7:
+            if self.builder.cur_texture_index == 0:
+                self.builder.center_y -= TILE_SIZE / 2
+            self.builder.cur_texture_index = 6
+            self.builder.set_texture(self.builder.cur_texture_index)
 
         # move builder
         if symbol == arcade.key.LEFT:
             if self.builder.center_x > TILE_SIZE:
                 self.builder.center_x -= TILE_SIZE
         elif symbol == arcade.key.RIGHT:
-            if self.builder.center_x < self.game.level_width - TILE_SIZE:
+            if self.builder.center_x < self.level_width - TILE_SIZE:
                 self.builder.center_x += TILE_SIZE
         elif symbol == arcade.key.UP:
-            if self.builder.center_y < self.window.height - TILE_SIZE:
+            if self.builder.center_y < self.level_height - TILE_SIZE:
                 self.builder.center_y += TILE_SIZE
         elif symbol == arcade.key.DOWN:
             if self.builder.center_y > TILE_SIZE:
@@ -271,14 +542,50 @@ class MakerView(arcade.View):
             self.builder.scale = PLAYER_SCALE
         elif self.textures_indices[self.builder.cur_texture_index] == "platform":
             self.builder.scale = 1.0
-        elif self.textures_indices[self.builder.cur_texture_index] == "enemy":
+        elif self.textures_indices[self.builder.cur_texture_index] in (
+            "enemy",
+            "patroller",
+            "jumper",
+        ):
             self.builder.scale = ENEMY_SCALE
         elif self.textures_indices[self.builder.cur_texture_index] == "coin":
             self.builder.scale = COIN_SCALE
         elif self.textures_indices[self.builder.cur_texture_index] == "x":
             self.builder.scale = X_SCALE
+        # tint moving enemy builds like their sprites
+        build = BUILD_KINDS.get(self.textures_indices[self.builder.cur_texture_index])
+        self.builder.color = level.TINTS.get(build, arcade.color.WHITE)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Sidescroller Maker")
+    parser.add_argument(
+        "--startup",
+        action="store_true",
+        help="print a breakdown of startup time after the first frame",
+    )
+    parser.add_argument("--world", help="chunked world file to edit (see world.py)")
+    parser.add_argument(
+        "--tile-physics",
+        action="store_true",
+        help="move the player against the tile grid instead of platform sprites",
+    )
+    args = parser.parse_args(argv)
+
+    startup = StartupTimer(LAUNCH_TIME)
+    startup.mark("imports")
+    get_window()
+    startup.mark("window")
+    view.maker_view = MakerView()
+    view.maker_view.tile_physics = args.tile_physics
+    if args.world:
+        view.maker_view.open_world(world.World(args.world, writable=True))
+    window.show_view(view.maker_view)
+    startup.mark("maker")
+    if args.startup:
+        view.maker_view.startup = startup
+    arcade.run()
 
 
-view.maker_view = MakerView()
-window.show_view(view.maker_view)
-arcade.run()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Parallax star layers generated one screen-width chunk at a time.
+
+Stars for a chunk are generated in bulk with NumPy from (seed, chunk index),
+so a chunk that scrolls out of view can be dropped and rebuilt identically
+when it comes back. Only the chunks in view are kept.
+"""
+
+import random
+import arcade
+import numpy as np
+
+BG_STAR_COLOR = (255, 255, 255, 95)
+FG_STAR_COLORS = [
+    arcade.color.WHITE,
+    arcade.color.BABY_BLUE,
+    arcade.color.AQUA,
+    arcade.color.BUFF,
+    arcade.color.ALIZARIN_CRIMSON,
+]
+
+# two triangles per star, as offsets of the (x, y, x + w, y + h) corners
+_CORNERS = np.array([[0, 1], [2, 1], [0, 3], [2, 1], [2, 3], [0, 3]])
+
+
+def star_points(rng: np.random.Generator, count, width, height, colors):
+    """Generate [count] stars as triangle vertices and matching vertex colors."""
+    x = rng.integers(0, width, count, endpoint=True)
+    y = rng.integers(0, height, count, endpoint=True)
+    w = rng.integers(1, 3, count, endpoint=True)
+    h = rng.integers(1, 3, count, endpoint=True)
+    # create_rectangle_filled centers each star on (x, y)
+    bounds = np.stack([x - w / 2, y - h / 2, x + w / 2, y + h / 2], axis=1)
+    points = bounds[:, _CORNERS].reshape(-1, 2)
+    palette = np.array([arcade.types.Color.from_iterable(c) for c in colors])
+    star_colors = palette[rng.integers(0, len(colors), count)]
+    return points.tolist(), np.repeat(star_colors, 6, axis=0).tolist()
+
+
+def make_stars(rng, count, width, height, colors) -> arcade.shape_list.Shape:
+    points, vertex_colors = star_points(rng, count, width, height, colors)
+    return arcade.shape_list.create_triangles_filled_with_colors(points, vertex_colors)
+
+
+class ParallaxLayer:
+    """An endless star layer scrolling at [speed] times the camera's speed.
+
+    [density] is the number of stars per chunk; chunks are [width] wide.
+    """
+
+    def __init__(
+        self,
+        width,
+        height,
+        speed,
+        density=100,
+        colors=(BG_STAR_COLOR,),
+        seed=None,
+    ) -> None:
+        self.width = width
+        self.height = height
+        self.speed = speed
+        self.density = density
+        self.colors = colors
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.chunks: dict[int, arcade.shape_list.ShapeElementList] = {}
+        self.offset = 0.0
+
+    def make_chunk(self, index) -> arcade.shape_list.ShapeElementList:
+        rng = np.random.default_rng([self.seed, index % 2**32])
+        chunk = arcade.shape_list.ShapeElementList()
+        chunk.append(
+            make_stars(rng, self.density, self.width, self.height, self.colors)
+        )
+        return chunk
+
+    def update(self, left, bottom=0.0) -> None:
+        """Scroll to a camera whose bottom left corner is at ([left], [bottom]),
+        keeping only visible chunks. Stars don't scroll vertically."""
+        self.offset = left * self.speed
+        first = int((left - self.offset) // self.width)
+        visible = range(first, first + 2)
+        for index in [index for index in self.chunks if index not in visible]:
+            del self.chunks[index]
+        for index in visible:
+            if index not in self.chunks:
+                self.chunks[index] = self.make_chunk(index)
+            self.chunks[index].center_x = index * self.width + self.offset
+            self.chunks[index].center_y = bottom
+
+    def draw(self) -> None:
+        for chunk in self.chunks.values():
+            chunk.draw()
@@ -0,0 +1,168 @@
+"""Opt-in per-phase frame timing for GameView, MakerView and headless simulations.
+
+Wrap work in ``with profiler.phase("name"):`` and call ``end_frame()`` once per
+frame. Nothing is recorded while the profiler is disabled.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+import arcade
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, profiler: "FrameProfiler", name) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        elapsed = (time.perf_counter() - self.start) * 1000
+        frame = self.profiler.frame
+        frame[self.name] = frame.get(self.name, 0.0) + elapsed
+
+
+class FrameProfiler:
+    """Per-phase frame timer keeping a rolling window and an exportable history.
+
+    Times are in milliseconds.
+    """
+
+    def __init__(self, enabled=False, window=300, history=100_000) -> None:
+        self.enabled = enabled
+        self.frame: dict[str, float] = {}
+        self.frame_count = 0
+        self.recent: dict[str, deque] = {}
+        self.window = window
+        self.samples: deque[dict] = deque(maxlen=history)
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+        for name, elapsed in self.frame.items():
+            if name not in self.recent:
+                self.recent[name] = deque(maxlen=self.window)
+            self.recent[name].append(elapsed)
+        self.samples.append({"frame": self.frame_count, **self.frame})
+        self.frame_count += 1
+        self.frame = {}
+
+    def reset(self) -> None:
+        self.frame = {}
+        self.frame_count = 0
+        self.recent.clear()
+        self.samples.clear()
+
+    def percentiles(self) -> dict[str, dict[str, float]]:
+        """Rolling percentiles of each phase over the last [window] frames."""
+        result = {}
+        for name, times in self.recent.items():
+            values = np.percentile(np.fromiter(times, float), PERCENTILES)
+            result[name] = {f"p{p}": float(v) for p, v in zip(PERCENTILES, values)}
+        return result
+
+    def phases(self) -> list[str]:
+        names = {}
+        for sample in self.samples:
+            names.update(dict.fromkeys(sample))
+        names.pop("frame", None)
+        return list(names)
+
+    def export_csv(self, path) -> None:
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, ["frame", *self.phases()], restval=0.0)
+            writer.writeheader()
+            writer.writerows(self.samples)
+
+    def export_json(self, path) -> None:
+        with open(path, "w") as file:
+            json.dump(
+                {"percentiles": self.percentiles(), "samples": list(self.samples)},
+                file,
+            )
+
+
+class ProfilerOverlay:
+    """On-screen table of rolling phase percentiles, refreshed every [refresh] frames."""
+
+    def __init__(self, profiler: FrameProfiler, x=10, y=10, refresh=30) -> None:
+        self.profiler = profiler
+        self.refresh = refresh
+        self.visible = False
+        self.camera = arcade.Camera2D()
+        self.text = arcade.Text(
+            "",
+            x,
+            y,
+            arcade.color.WHITE,
+            12,
+            width=400,
+            multiline=True,
+            anchor_y="bottom",
+            font_name=("Courier New", "Courier", "monospace"),
+        )
+
+    def toggle(self) -> None:
+        """Show or hide the overlay; profiling is enabled while it is shown."""
+        self.visible = not self.visible
+        self.profiler.enabled = self.visible
+
+    def draw(self) -> None:
+        if not self.visible:
+            return
+        if self.profiler.frame_count % self.refresh == 0 or not self.text.text:
+            lines = [f"{'phase (ms)':<16}{'p50':>7}{'p95':>7}{'p99':>7}"]
+            for name, values in self.profiler.percentiles().items():
+                lines.append(
+                    f"{name:<16}{values['p50']:>7.2f}{values['p95']:>7.2f}"
+                    f"{values['p99']:>7.2f}"
+                )
+            self.text.text = "\n".join(lines)
+        self.camera.use()
+        self.text.draw()
+
+
+class StartupTimer:
+    """Named startup marks, timed from [start] (a time.perf_counter() value)."""
+
+    def __init__(self, start=None) -> None:
+        self.start = time.perf_counter() if start is None else start
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, name) -> None:
+        self.marks.append((name, time.perf_counter()))
+
+    def total(self) -> float:
+        return self.marks[-1][1] - self.start if self.marks else 0.0
+
+    def summary(self) -> str:
+        lines = ["startup (ms)"]
+        previous = self.start
+        for name, at in self.marks:
+            lines.append(f"  {name:<12}{(at - previous) * 1000:>8.1f}")
+            previous = at
+        lines.append(f"  {'total':<12}{self.total() * 1000:>8.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,312 @@
+"""Static reachability analysis for maker levels.
+
+Jump arcs are precomputed from the player's jump settings and gravity into
+reach tables, then a graph search over the standable cells of the tile grid
+finds coins and enemies the player can never touch and soft-locks: places
+the player can get to but can't get back to the start from, or die from.
+
+Only walls too high to jump over block the arcs; ceilings and lower walls
+are ignored, so the analysis is optimistic: every coin or enemy it reports
+is really out of reach, but some problems may go unreported.
+"""
+
+from bisect import bisect_left, bisect_right
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from engine import TILE_SIZE
+import level
+
+PLAYER_HEIGHT = 2  # tiles
+FOOT_TOLERANCE = TILE_SIZE  # player width / 2 + tile width / 2, about a tile
+
+
+def arcs(jumps, jump_speed, gravity, floor) -> list[list[tuple[int, float]]]:
+    """(tick, height) points of jump arcs using 1..[jumps] jumps chained at the apex.
+
+    Heights are in pixels relative to the take-off height; each arc ends below [floor].
+    """
+    result = []
+    for chained in range(1, jumps + 1):
+        height = 0.0
+        speed = jump_speed
+        used = 1
+        tick = 0
+        points = [(0, 0.0)]
+        while height >= floor:
+            # same order as PhysicsEnginePlatformer: gravity, then move
+            speed -= gravity
+            height += speed
+            tick += 1
+            if speed <= 0 and used < chained:
+                speed = jump_speed
+                used += 1
+            points.append((tick, height))
+        result.append(points)
+    return result
+
+
+def to_tiles(pixels) -> int:
+    return int((pixels + FOOT_TOLERANCE) // TILE_SIZE)
+
+
+class ReachTables:
+    """How far (in columns) the player can get for each row offset.
+
+    land[dy]: furthest column offset at which the player can land [dy] rows
+    above (negative: below) where it took off.
+    touch[dy]: furthest column offset at which the player's body can overlap
+    a tile [dy] rows above its feet at take-off.
+    """
+
+    def __init__(self, jumps, jump_speed, movement_speed, gravity, rows) -> None:
+        self.land: dict[int, int] = {}
+        self.touch: dict[int, int] = {}
+        floor = -(rows + 1) * TILE_SIZE
+        for points in arcs(jumps, jump_speed, gravity, floor):
+            for (_, previous), (tick, height) in zip(points, points[1:]):
+                reach = to_tiles(movement_speed * tick)
+                # descending through a row boundary lands on that row
+                if height < previous:
+                    for dy in range(
+                        int(height // TILE_SIZE) + 1, int(previous // TILE_SIZE) + 1
+                    ):
+                        self.land[dy] = max(self.land.get(dy, 0), reach)
+                bottom = int(height // TILE_SIZE)
+                top = int((height + PLAYER_HEIGHT * TILE_SIZE - 1) // TILE_SIZE)
+                for dy in range(bottom, top + 1):
+                    self.touch[dy] = max(self.touch.get(dy, 0), reach)
+        self.land[0] = max(self.land.get(0, 0), 1)  # walking
+        for dy in range(PLAYER_HEIGHT):
+            self.touch[dy] = max(self.touch.get(dy, 0), 0)
+        # furthest sideways reach while falling out of the level
+        self.fall = max(self.land.values())
+
+
+class Report:
+    def __init__(self) -> None:
+        self.start = None
+        self.reachable: set[tuple[int, int]] = set()
+        self.unreachable_coins: list[tuple[int, int]] = []
+        self.unreachable_enemies: list[tuple[int, int]] = []
+        self.soft_locks: list[tuple[int, int]] = []
+        self.seconds = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not (
+            self.unreachable_coins or self.unreachable_enemies or self.soft_locks
+        )
+
+
+def segments(cells) -> list[tuple[int, int, int]]:
+    """Group cells into (row, first x, last x) runs the player can walk along."""
+    runs = []
+    for x, y in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+        if runs and runs[-1][0] == y and runs[-1][2] == x - 1:
+            runs[-1] = y, runs[-1][1], x
+        else:
+            runs.append((y, x, x))
+    return runs
+
+
+class _Row:
+    """Sorted runs of one row, with 'next unvisited' pointers for range scans."""
+
+    def __init__(self, y) -> None:
+        self.y = y
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.next: list[int] = []
+        self.left = 0
+
+    def _find(self, i) -> int:
+        pointers = self.next
+        root = i
+        while pointers[root] != root:
+            root = pointers[root]
+        while pointers[i] != root:
+            pointers[i], i = root, pointers[i]
+        return root
+
+    def within(self, low, high) -> list[tuple[int, int, int]]:
+        """Runs overlapping [low, high]."""
+        starts, ends = self.starts, self.ends
+        runs = []
+        i = bisect_left(ends, low)
+        while i < len(starts) and starts[i] <= high:
+            runs.append((self.y, starts[i], ends[i]))
+            i += 1
+        return runs
+
+    def take(self, low, high) -> list[tuple[int, int, int]]:
+        """Like within(), but skips and marks visited runs."""
+        starts, ends = self.starts, self.ends
+        runs = []
+        i = self._find(bisect_left(ends, low))
+        while i < len(starts) and starts[i] <= high:
+            runs.append((self.y, starts[i], ends[i]))
+            self.next[i] = i + 1
+            i = self._find(i + 1)
+        self.left -= len(runs)
+        return runs
+
+    def any_in(self, low, high) -> bool:
+        i = bisect_left(self.ends, low)
+        return i < len(self.ends) and self.starts[i] <= high
+
+
+def make_rows(runs) -> dict[int, _Row]:
+    rows = {}
+    for y, first, last in sorted(runs):
+        if y not in rows:
+            rows[y] = _Row(y)
+        rows[y].starts.append(first)
+        rows[y].ends.append(last)
+    for row in rows.values():
+        row.left = len(row.starts)
+        row.next = list(range(row.left + 1))
+    return rows
+
+
+def walls(solid, rise) -> dict[int, list[int]]:
+    """Columns the player can't jump past, by the row its feet are on.
+
+    A column stops the player if its stack of tiles touches the player's body
+    and reaches at least [rise] rows above its feet, too high to land on.
+    """
+    stacks = {}
+    for x, y in sorted(solid):
+        column = stacks.setdefault(x, [])
+        if column and column[-1][1] == y - 1:
+            column[-1][1] = y
+        else:
+            column.append([y, y])
+    result = {}
+    for x, column in stacks.items():
+        for bottom, top in column:
+            for y in range(max(bottom - PLAYER_HEIGHT + 1, 0), top - rise + 1):
+                result.setdefault(y, []).append(x)
+    for columns in result.values():
+        columns.sort()
+    return result
+
+
+def search(starts, runs, offsets, blocked, reverse=False) -> set[tuple[int, int, int]]:
+    """Graph search over [runs] where [offsets] maps dy -> max |dx| of each move.
+
+    Moves can't pass the [blocked] columns of the row they start from, which
+    is the target row when searching [reverse] (with negated offsets).
+    """
+    rows = make_rows(runs)
+    # the rows each row can move to, so empty rows are never looked at
+    targets = {
+        y: [
+            (reach, rows[y + dy], blocked.get(y + dy if reverse else y, []))
+            for dy, reach in offsets.items()
+            if y + dy in rows
+        ]
+        for y in rows
+    }
+    for y, first, last in starts:
+        rows[y].take(first, last)
+    found = set(starts)
+    frontier = list(found)
+    while frontier:
+        y, first, last = frontier.pop()
+        for reach, row, columns in targets[y]:
+            if not row.left:
+                continue
+            low, high = first - reach, last + reach
+            if columns:
+                i = bisect_left(columns, first)
+                if i:
+                    low = max(low, columns[i - 1] + 1)
+                i = bisect_right(columns, last)
+                if i < len(columns):
+                    high = min(high, columns[i] - 1)
+            taken = row.take(low, high)
+            found.update(taken)
+            frontier.extend(taken)
+    return found
+
+
+def touchable(entity, rows: dict[int, _Row], touch: dict[int, int]) -> bool:
+    """Whether some standing cell in [rows] can reach [entity] with its body."""
+    x, y = entity
+    return any(
+        y - dy in rows and rows[y - dy].any_in(x - reach, x + reach)
+        for dy, reach in touch.items()
+    )
+
+
+def cells(runs) -> list[tuple[int, int]]:
+    return [(x, y) for y, first, last in runs for x in range(first, last + 1)]
+
+
+def analyze(
+    play_level: level.Level, jumps, jump_speed, movement_speed, gravity, rows
+) -> Report:
+    start_time = time.perf_counter()
+    report = Report()
+    tables = ReachTables(jumps, jump_speed, movement_speed, gravity, rows)
+    columns = play_level.level_width // TILE_SIZE
+    # the player is kept inside the level, so platforms past its edges don't count
+    solid = {(x, y) for x, y in play_level.platforms if 0 <= x < columns}
+    blocked = walls(solid, max(tables.land))
+
+    standable = segments(
+        (x, y + 1)
+        for x, y in solid
+        if all((x, y + 1 + h) not in solid for h in range(PLAYER_HEIGHT))
+    )
+
+    # the player drops from its start tile onto the first run below
+    start_x, start_y = play_level.player
+    below = [
+        run for run in standable if run[1] <= start_x <= run[2] and run[0] <= start_y
+    ]
+    reachable = set()
+    if below:
+        start = max(below)
+        report.start = start_x, start[0]
+        reachable = search([start], standable, tables.land, blocked)
+    report.reachable = set(cells(reachable))
+    reachable_rows = make_rows(reachable)
+
+    report.unreachable_coins = [
+        coin
+        for coin in play_level.coins
+        if not touchable(coin, reachable_rows, tables.touch)
+    ]
+    report.unreachable_enemies = [
+        enemy
+        for enemy in play_level.all_enemies()
+        if not touchable(enemy, reachable_rows, tables.touch)
+    ]
+
+    # soft-locks: reachable runs that can't get back to the start or die
+    escapes = [start] if below else []
+    # lowest platform row within falling reach of each column; the player
+    # falls out of the level from a run that has a column without any platform
+    # at or above its height within reach
+    lowest = np.full(columns + 2 * tables.fall, rows + 1)
+    for x, y in solid:
+        lowest[x + tables.fall] = min(lowest[x + tables.fall], y)
+    lowest[: tables.fall] = lowest[columns + tables.fall :] = -1
+    window = sliding_window_view(lowest, 2 * tables.fall + 1).max(axis=1).tolist()
+    for run in reachable:
+        y, first, last = run
+        if max(window[first : last + 1]) >= y:
+            escapes.append(run)
+    # touching an enemy respawns the player too
+    for x, y in play_level.all_enemies():
+        for dy, reach in tables.touch.items():
+            if y - dy in reachable_rows:
+                escapes.extend(reachable_rows[y - dy].within(x - reach, x + reach))
+    backwards = {-dy: reach for dy, reach in tables.land.items()}
+    can_escape = search(set(escapes), reachable, backwards, blocked, reverse=True)
+    report.soft_locks = sorted(cells(reachable - can_escape))
+
+    report.seconds = time.perf_counter() - start_time
+    return report
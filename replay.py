@@ -0,0 +1,148 @@
+"""Record the inputs of a play session and replay them headlessly at full speed.
+
+A trace holds the key events of every simulation tick, each tick's delta time,
+the star seed, the physics engine and, optionally, the level it was played on.
+Replaying one feeds the same inputs into a fresh Simulation without waiting on
+a window.
+"""
+
+import struct
+from array import array
+import level
+from engine import PLAYER_SCALE, Simulation, make_player, make_simulation
+
+VERSION = 2
+MAGIC = b"SSMR"
+# magic, version, seed, update rate, view width, ticks, events, level bytes, flags
+HEADER = struct.Struct("<4sHIdIIIIB")
+TILE_PHYSICS = 1  # flag: played with engine.TilePhysicsEngine
+EVENT = struct.Struct("<IIB")  # tick, key symbol, pressed
+
+
+class Trace:
+    def __init__(
+        self,
+        seed,
+        update_rate=1 / 60,
+        view_width=800,
+        level_data=b"",
+        tile_physics=False,
+    ) -> None:
+        self.seed = seed
+        self.update_rate = update_rate
+        self.view_width = view_width
+        self.level_data = level_data
+        self.tile_physics = tile_physics
+        self.events: list[tuple[int, int, bool]] = []
+        self.delta_times = array("d")
+
+    @property
+    def ticks(self) -> int:
+        return len(self.delta_times)
+
+    def inputs(self) -> list[list[tuple[int, bool]]]:
+        """Key events grouped by tick."""
+        ticks = [[] for _ in range(self.ticks)]
+        for tick, symbol, pressed in self.events:
+            ticks[tick].append((symbol, pressed))
+        return ticks
+
+
+class Recorder:
+    """Attach to a simulation with ``sim.recorder = Recorder(trace)``."""
+
+    def __init__(self, trace: Trace) -> None:
+        self.trace = trace
+        self.start_tick = None
+
+    def record(self, tick, inputs, delta_time) -> None:
+        if self.start_tick is None:
+            self.start_tick = tick
+        tick -= self.start_tick
+        for symbol, pressed in inputs:
+            self.trace.events.append((tick, symbol, pressed))
+        self.trace.delta_times.append(delta_time)
+
+
+def start_recording(sim: Simulation, seed, play_level: level.Level = None) -> Trace:
+    level_data = b"" if play_level is None else level.to_bytes(play_level)
+    trace = Trace(seed, sim.update_rate, sim.view_width, level_data, sim.tile_physics)
+    sim.recorder = Recorder(trace)
+    return trace
+
+
+def to_bytes(trace: Trace) -> bytes:
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        trace.seed,
+        trace.update_rate,
+        trace.view_width,
+        trace.ticks,
+        len(trace.events),
+        len(trace.level_data),
+        TILE_PHYSICS if trace.tile_physics else 0,
+    )
+    events = b"".join(EVENT.pack(*event) for event in trace.events)
+    return header + trace.level_data + events + trace.delta_times.tobytes()
+
+
+def from_bytes(data: bytes) -> Trace:
+    magic, version, seed, update_rate, view_width, ticks, events, level_size, flags = (
+        HEADER.unpack_from(data)
+    )
+    if magic != MAGIC:
+        raise ValueError("not a replay file")
+    if version != VERSION:
+        raise ValueError(f"unsupported replay version: {version}")
+    start = HEADER.size
+    level_data = data[start : start + level_size]
+    trace = Trace(seed, update_rate, view_width, level_data, bool(flags & TILE_PHYSICS))
+    start += level_size
+    end = start + events * EVENT.size
+    trace.events = [
+        (tick, symbol, bool(pressed))
+        for tick, symbol, pressed in EVENT.iter_unpack(data[start:end])
+    ]
+    trace.delta_times.frombytes(data[end : end + ticks * 8])
+    if trace.ticks != ticks:
+        raise ValueError("truncated replay file")
+    return trace
+
+
+def save(trace: Trace, path) -> None:
+    with open(path, "wb") as file:
+        file.write(to_bytes(trace))
+
+
+def load(path) -> Trace:
+    with open(path, "rb") as file:
+        return from_bytes(file.read())
+
+
+def make_replay_simulation(trace: Trace) -> Simulation:
+    """Build the simulation for a trace that carries its level, as the maker does."""
+    play_level = level.from_bytes(trace.level_data)
+    sim = make_simulation(
+        make_player(PLAYER_SCALE),
+        play_level.level_width,
+        update_rate=trace.update_rate,
+        view_width=trace.view_width,
+        tile_physics=trace.tile_physics,
+    )
+    level.build(play_level, sim)
+    sim.setup_physics()
+    return sim
+
+
+def replay(trace: Trace, sim: Simulation = None) -> Simulation:
+    """Step [sim] through every tick of [trace] as fast as possible.
+
+    The trace's seed is the star seed of the recorded GameView; pass it to
+    make_game(star_seed=...) to draw the same stars.
+    """
+    if sim is None:
+        sim = make_replay_simulation(trace)
+    for inputs, delta_time in zip(trace.inputs(), trace.delta_times):
+        sim.step(inputs, delta_time)
+    return sim
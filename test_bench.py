@@ -0,0 +1,55 @@
+import json
+import bench
+
+RESULT = {"tiles": 1000, "level_width": 4000, "construct": 0.5, "tick_mean": 0.002}
+
+
+def fake_bench_size(args, size, rng):
+    return dict(RESULT)
+
+
+def write_baseline(path, scale):
+    baseline = {
+        "results": {
+            "1000": {
+                name: value * scale if name not in ("tiles", "level_width") else value
+                for name, value in RESULT.items()
+            }
+        }
+    }
+    path.write_text(json.dumps(baseline))
+
+
+def test_compare_flags_slowdowns():
+    baseline = {"results": {"1000": {"construct": 0.1, "tick_mean": 0.002}}}
+    results = {"results": {"1000": {"construct": 0.5, "tick_mean": 0.002}}}
+    assert bench.compare(results, baseline, 1.25) == ["1000 construct: x5.00"]
+
+
+def test_regression_against_faster_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, "bench_size", fake_bench_size)
+    baseline = tmp_path / "bench.json"
+    write_baseline(baseline, 0.01)
+    output = tmp_path / "bench-new.json"
+    argv = ["--sizes", "1000", "--baseline", str(baseline), "--output", str(output)]
+    assert bench.main(argv) == 1
+    # the baseline is left as it was
+    assert json.loads(baseline.read_text())["results"]["1000"]["construct"] == 0.005
+
+
+def test_no_regression_against_same_speed(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, "bench_size", fake_bench_size)
+    baseline = tmp_path / "bench.json"
+    write_baseline(baseline, 1.0)
+    output = tmp_path / "bench-new.json"
+    argv = ["--sizes", "1000", "--baseline", str(baseline), "--output", str(output)]
+    assert bench.main(argv) == 0
+
+
+def test_output_cannot_overwrite_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, "bench_size", fake_bench_size)
+    baseline = tmp_path / "bench.json"
+    write_baseline(baseline, 0.01)
+    argv = ["--sizes", "1000", "--baseline", str(baseline), "--output", str(baseline)]
+    assert bench.main(argv) == 2
+    assert json.loads(baseline.read_text())["results"]["1000"]["construct"] == 0.005
@@ -0,0 +1,402 @@
+"""Chunked worlds: levels stored as fixed-size tile chunks in a memory-mapped file.
+
+A world file (.sswc) is a header followed by one CHUNK_SIZE x CHUNK_SIZE
+block of tile kinds per chunk, row of chunks by row of chunks. The file is
+created sparse and mapped with NumPy, so only the chunks that are read or
+written take memory or disk. ChunkPager keeps the chunks around a view
+resident as sprites in a Simulation and evicts the least recently used ones
+beyond its budget, so memory stays bounded however large the world is.
+
+Create an empty world or convert a level file:
+
+    python world.py big.sswc --columns 100000 --rows 200
+    python world.py big.sswc --from level.ssml
+"""
+
+import argparse
+import os
+import struct
+import sys
+from collections import OrderedDict
+import arcade
+import numpy as np
+import level
+from engine import TILE_SIZE, Simulation, StaticLayer, make_walls
+
+VERSION = 1
+MAGIC = b"SSWC"
+CHUNK_SIZE = 16  # tiles per chunk side
+# magic, version, chunk size, columns, rows, player tile x/y, tile count per kind
+HEADER = struct.Struct("<4sHHIIii8Q")
+DATA_OFFSET = 4096  # chunk data starts on a page boundary
+EMPTY = 0  # no tile; level kinds are all non-zero
+CHUNK_BUDGET = 64  # resident chunks kept by a pager
+DEFAULT_ROWS = 15  # one 600 px window
+
+
+class World:
+    """A world file mapped into memory; [writable] worlds can be edited in place."""
+
+    def __init__(self, path, writable=False) -> None:
+        self.path = path
+        self.writable = writable
+        with open(path, "rb") as file:
+            header = HEADER.unpack(file.read(HEADER.size))
+        magic, version, self.chunk_size, self.columns, self.rows, *rest = header
+        if magic != MAGIC:
+            raise ValueError("not a world file")
+        if version != VERSION:
+            raise ValueError(f"unsupported world version: {version}")
+        self.player = tuple(rest[:2])
+        self.counts = np.array(rest[2:], np.int64)  # tiles of each kind
+        size = self.chunk_size
+        self.chunks_x = -(-self.columns // size)
+        self.chunks_y = -(-self.rows // size)
+        # [chunk y, chunk x, row in chunk, column in chunk]
+        self.cells = np.memmap(
+            path,
+            np.uint8,
+            "r+" if writable else "r",
+            DATA_OFFSET,
+            (self.chunks_y, self.chunks_x, size, size),
+        )
+        self.flat = self.cells.reshape(-1)
+
+    @property
+    def level_width(self) -> int:
+        return self.columns * TILE_SIZE
+
+    @property
+    def level_height(self) -> int:
+        return self.rows * TILE_SIZE
+
+    def count(self, *kinds) -> int:
+        return int(sum(self.counts[kind] for kind in kinds))
+
+    def chunk_of(self, tile_x, tile_y) -> tuple[int, int]:
+        return tile_x // self.chunk_size, tile_y // self.chunk_size
+
+    def chunk_tiles(self, chunk_x, chunk_y) -> dict[int, list[tuple[int, int]]]:
+        """The tiles of one chunk by kind."""
+        block = self.cells[chunk_y, chunk_x]
+        rows, columns = np.nonzero(block)
+        if not len(rows):
+            return {}
+        kinds = block[rows, columns]
+        tile_x = (columns + chunk_x * self.chunk_size).tolist()
+        tile_y = (rows + chunk_y * self.chunk_size).tolist()
+        tiles = {}
+        for kind, x, y in zip(kinds.tolist(), tile_x, tile_y):
+            tiles.setdefault(kind, []).append((x, y))
+        return tiles
+
+    def index(self, columns, rows) -> np.ndarray:
+        """Flat cell indices of in-range tile coordinate arrays."""
+        size = self.chunk_size
+        chunk = rows // size * self.chunks_x + columns // size
+        return (chunk * size + rows % size) * size + columns % size
+
+    def contains(self, tile_x, tile_y) -> bool:
+        return 0 <= tile_x < self.columns and 0 <= tile_y < self.rows
+
+    def inside(self, columns, rows) -> np.ndarray:
+        return (
+            (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        )
+
+    def solid_at(self, columns, rows) -> np.ndarray:
+        """Whether tiles hold a platform; used by MovingEnemies."""
+        inside = self.inside(columns, rows)
+        columns = np.minimum(np.maximum(columns, 0), self.columns - 1)
+        rows = np.minimum(np.maximum(rows, 0), self.rows - 1)
+        return (self.flat.take(self.index(columns, rows)) == level.PLATFORM) & inside
+
+    def set(self, tiles, kind) -> None:
+        """Set [tiles] to [kind] (or EMPTY), ignoring tiles outside the world."""
+        tiles = np.array(list(tiles), int).reshape(-1, 2)
+        if not len(tiles):
+            return
+        tiles = np.unique(tiles[self.inside(tiles[:, 0], tiles[:, 1])], axis=0)
+        index = self.index(tiles[:, 0], tiles[:, 1])
+        np.subtract.at(self.counts, self.flat[index], 1)
+        self.counts[kind] += len(index)
+        self.counts[EMPTY] = 0
+        self.flat[index] = kind
+
+    def flush(self) -> None:
+        """Write edits and the header back to the file."""
+        self.cells.flush()
+        with open(self.path, "r+b") as file:
+            file.write(header(self))
+
+    def to_level(self) -> level.Level:
+        """Every tile of the world as a Level; reads the whole file."""
+        new_level = level.Level(self.level_width, self.player)
+        chunk_y, chunk_x, rows, columns = np.nonzero(self.cells)
+        kinds = self.cells[chunk_y, chunk_x, rows, columns].tolist()
+        tile_x = (chunk_x * self.chunk_size + columns).tolist()
+        tile_y = (chunk_y * self.chunk_size + rows).tolist()
+        for kind, x, y in zip(kinds, tile_x, tile_y):
+            new_level.tiles(kind).append((x, y))
+        return new_level
+
+
+def header(world: World) -> bytes:
+    return HEADER.pack(
+        MAGIC,
+        VERSION,
+        world.chunk_size,
+        world.columns,
+        world.rows,
+        *world.player,
+        *world.counts.tolist(),
+    )
+
+
+def create(path, columns, rows, player=(2, 4), chunk_size=CHUNK_SIZE) -> World:
+    """Create an empty world file; it is sparse, so size costs no disk until used."""
+    chunks = -(-columns // chunk_size) * -(-rows // chunk_size)
+    with open(path, "wb") as file:
+        file.write(
+            HEADER.pack(MAGIC, VERSION, chunk_size, columns, rows, *player, *[0] * 8)
+        )
+        file.truncate(DATA_OFFSET + chunks * chunk_size * chunk_size)
+    return World(path, writable=True)
+
+
+def from_level(play_level: level.Level, path, rows=None) -> World:
+    """Write [play_level] out as a world at [path]."""
+    if rows is None:
+        top = max(
+            [y for kind in level.KINDS for _, y in play_level.tiles(kind)]
+            + [play_level.player[1] + 1]
+        )
+        rows = max(top + 1, DEFAULT_ROWS)
+    columns = -(-play_level.level_width // TILE_SIZE)
+    world = create(path, columns, rows, play_level.player)
+    for kind in level.KINDS:
+        world.set(play_level.tiles(kind), kind)
+    world.flush()
+    return world
+
+
+class ChunkPager:
+    """Keeps the chunks near a view resident as sprites in [sim].
+
+    Chunks are loaded when they come within [margin] chunks of the view and
+    evicted least recently used first once more than [budget] are resident.
+    Platforms come with collision walls merged per chunk, so paging never
+    recompiles the whole level. Coins collected and enemies defeated in an
+    evicted chunk stay gone until the simulation is reset.
+    """
+
+    def __init__(
+        self, world: World, sim: Simulation, budget=CHUNK_BUDGET, margin=1
+    ) -> None:
+        self.world = world
+        self.sim = sim
+        self.budget = budget
+        self.margin = margin
+        # resident chunks, least recently used first
+        self.resident: OrderedDict[tuple[int, int], None] = OrderedDict()
+        # resident tiles keyed by (tile_x, tile_y) -> (kind, sprite)
+        self.tiles: dict[tuple[int, int], tuple[int, arcade.Sprite]] = {}
+        # every resident tile sprite, for drawing in the maker
+        self.sprites = StaticLayer(world.chunk_size * TILE_SIZE)
+        self.walls: dict[tuple[int, int], list[arcade.Sprite]] = {}
+        # collected or defeated tiles of evicted chunks, skipped on reload
+        self.taken: set[tuple[int, int]] = set()
+        self.view = None
+        self.loads = 0
+        self.evictions = 0
+        self.compacted = 0  # evictions at the last Simulation.compact()
+
+        sim.pager = self
+        sim.moving.grid = world
+        self.update_totals()
+
+    def chunk_range(self, low, high, chunks) -> range:
+        span = self.world.chunk_size * TILE_SIZE
+        return range(
+            max(int(low // span) - self.margin, 0),
+            min(int(high // span) + self.margin, chunks - 1) + 1,
+        )
+
+    def update(self, left, bottom, right, top) -> None:
+        """Page in the chunks around the view [left, right] x [bottom, top]."""
+        view = (
+            self.chunk_range(left, right, self.world.chunks_x),
+            self.chunk_range(bottom, top, self.world.chunks_y),
+        )
+        if view == self.view:
+            return
+        self.view = view
+        columns, rows = view
+        for chunk_y in rows:
+            for chunk_x in columns:
+                key = chunk_x, chunk_y
+                if key in self.resident:
+                    self.resident.move_to_end(key)
+                else:
+                    self.load(key)
+        while len(self.resident) > self.budget:
+            chunk_x, chunk_y = key = next(iter(self.resident))
+            if chunk_x in columns and chunk_y in rows:
+                break  # everything left is in view
+            self.evict(key)
+        if self.evictions - self.compacted >= self.budget:
+            self.sim.compact()
+            self.compacted = self.evictions
+        self.update_totals()
+
+    def update_totals(self) -> None:
+        """Count every coin and enemy of the world, resident or not."""
+        self.sim.total_coins = self.world.count(level.COIN)
+        self.sim.total_enemies = self.world.count(
+            level.ENEMY, level.PATROLLER, level.JUMPER
+        )
+
+    def add(self, kind, tiles) -> None:
+        sprites = level.make_tile_sprites(kind, tiles)
+        for tile, sprite in zip(tiles, sprites):
+            self.tiles[tile] = kind, sprite
+        self.sprites.extend(sprites)
+        if kind == level.PLATFORM:
+            self.sim.add_platforms(sprites, walls=[])
+        else:
+            level.add_sprites(self.sim, kind, sprites)
+
+    def load(self, key) -> None:
+        for kind, tiles in self.world.chunk_tiles(*key).items():
+            if kind != level.PLATFORM and self.taken:
+                tiles = [tile for tile in tiles if tile not in self.taken]
+            self.add(kind, tiles)
+        self.walls[key] = []
+        self.update_walls(key)
+        self.resident[key] = None
+        self.loads += 1
+
+    def evict(self, key) -> None:
+        sim = self.sim
+        removed = {}
+        for kind, tiles in self.world.chunk_tiles(*key).items():
+            for tile in tiles:
+                if tile in self.tiles:  # else taken before the chunk was loaded
+                    removed.setdefault(kind, []).append((tile, self.tiles.pop(tile)[1]))
+        self.sprites.remove_many([s for pairs in removed.values() for _, s in pairs])
+        sim.remove_walls(self.walls.pop(key))
+        for kind, pairs in removed.items():
+            if kind == level.PLATFORM:
+                sim.remove_platforms([sprite for _, sprite in pairs], walls=[])
+                continue
+            in_play = sim.coin_sprites if kind == level.COIN else sim.enemy_sprites
+            present, taken = [], []
+            for tile, sprite in pairs:
+                if sprite in in_play:
+                    present.append(sprite)
+                else:
+                    taken.append((tile, sprite))
+            level.remove_sprites(sim, kind, present)
+            if taken:
+                self.take(kind, taken)
+        del self.resident[key]
+        self.evictions += 1
+
+    def take(self, kind, taken) -> None:
+        """Forget collected or defeated sprites of an evicted chunk until reset."""
+        sim = self.sim
+        sprites = {sprite for _, sprite in taken}
+        if kind == level.COIN:
+            sim.collected_coin_sprites = [
+                s for s in sim.collected_coin_sprites if s not in sprites
+            ]
+        else:
+            sim.defeated_enemies = [s for s in sim.defeated_enemies if s not in sprites]
+            sim.moving.remove(sprites)
+        self.taken.update(tile for tile, _ in taken)
+
+    def update_walls(self, key) -> None:
+        """Remake the collision walls of a resident chunk from its platforms."""
+        platforms = self.world.chunk_tiles(*key).get(level.PLATFORM, [])
+        self.sim.remove_walls(self.walls[key])
+        self.walls[key] = make_walls(platforms)
+        self.sim.add_walls(self.walls[key])
+
+    def reset(self) -> None:
+        """Bring back everything taken from evicted chunks; called on Simulation.reset()."""
+        chunks = {self.world.chunk_of(*tile) for tile in self.taken}
+        self.taken.clear()
+        for key in chunks & self.resident.keys():
+            self.evict(key)
+            self.load(key)
+        self.update_totals()
+
+    def place(self, kind, tiles) -> None:
+        """Write [kind] to empty [tiles]; resident ones get sprites too."""
+        self.world.set(tiles, kind)
+        tiles = [
+            tile
+            for tile in tiles
+            if self.world.contains(*tile)
+            and self.world.chunk_of(*tile) in self.resident
+        ]
+        self.add(kind, tiles)
+        if kind == level.PLATFORM:
+            for key in {self.world.chunk_of(*tile) for tile in tiles}:
+                self.update_walls(key)
+        self.update_totals()
+
+    def remove(self, tiles) -> None:
+        """Clear [tiles], removing the sprites of resident ones."""
+        tiles = list(tiles)
+        self.world.set(tiles, EMPTY)
+        removed = {}
+        for tile in tiles:
+            if tile in self.tiles:
+                kind, sprite = self.tiles.pop(tile)
+                removed.setdefault(kind, []).append(sprite)
+        self.sprites.remove_many([s for sprites in removed.values() for s in sprites])
+        for kind, sprites in removed.items():
+            if kind == level.PLATFORM:
+                self.sim.remove_platforms(sprites, walls=[])
+            else:
+                level.remove_sprites(self.sim, kind, sprites)
+        if level.PLATFORM in removed:
+            for key in {
+                self.world.chunk_of(*tile) for tile in tiles
+            } & self.resident.keys():
+                self.update_walls(key)
+        self.update_totals()
+
+
+def build(world: World, sim: Simulation, budget=CHUNK_BUDGET) -> ChunkPager:
+    """Attach a pager for [world] to an empty simulation, as level.build() does."""
+    sim.player.start_x, sim.player.start_y = level.player_center(*world.player)
+    sim.player.position = sim.player.start_x, sim.player.start_y
+    pager = ChunkPager(world, sim, budget)
+    sim.update_regions()
+    return pager
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="world file to create")
+    parser.add_argument("--from", dest="source", help="level file to convert")
+    parser.add_argument("--columns", type=int, default=1_000)
+    parser.add_argument("--rows", type=int)
+    args = parser.parse_args(argv)
+
+    if args.source:
+        world = from_level(level.load(args.source), args.path, args.rows)
+    else:
+        world = create(args.path, args.columns, args.rows or DEFAULT_ROWS)
+    print(
+        f"{world.columns} x {world.rows} tiles in "
+        f"{world.chunks_x * world.chunks_y} chunks, "
+        f"{os.path.getsize(args.path)} bytes"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())